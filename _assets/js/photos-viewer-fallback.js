@@ -39,6 +39,8 @@
       var base = '/_assets/images/photos/' + (theSlug ? theSlug + '/' : '');
       var thumb = base + 'thumbnails/' + fname;
       if(img.src !== thumb){
+        // A responsive srcset would win over src, so drop it first
+        img.removeAttribute('srcset');
         img.src = thumb;
       }
     }catch(e){ console.error('photos-viewer-fallback error', e); }
@@ -0,0 +1,138 @@
+// Photo collection viewer shared by every photos/<slug>/ page.
+// The page only carries the grid and the viewer markup; the image list
+// (file, caption, alt, srcset) lives in a per-collection JSON file that is
+// fetched the first time the viewer opens, so the grid paints without
+// parsing it. Configuration comes from data attributes on #photo-viewer:
+//   data-slug    collection slug (originals live under /_assets/images/photos/<slug>/)
+//   data-images  URL of the collection's images.json
+//   data-count   number of photos (for the counter before the JSON arrives)
+//   data-prefetch  photos to fetch and decode ahead of/behind the current one
+//                  (`prefetch:` in _data/photos.yml; 0 disables)
+(function(){
+  var viewer = document.getElementById("photo-viewer");
+  if(!viewer) return;
+
+  var slug = viewer.getAttribute("data-slug") || "";
+  var imagesUrl = viewer.getAttribute("data-images") || "";
+  var totalImages = parseInt(viewer.getAttribute("data-count"), 10) || 0;
+  var images = null;
+  var pending = null;
+  var currentIndex = 0;
+  var prefetchWindow = parseInt(viewer.getAttribute("data-prefetch"), 10);
+  if(isNaN(prefetchWindow) || prefetchWindow < 0) prefetchWindow = 2;
+  // index -> detached Image holding a decoded neighbour; never larger than
+  // 2 * prefetchWindow entries so long collections don't pile up bitmaps.
+  var prefetched = {};
+  var grid = document.getElementById("photo-grid");
+  var viewerImage = document.getElementById("viewer-image");
+  var captionText = document.getElementById("caption-text");
+  var photoCounter = document.getElementById("photo-counter");
+
+  // Last resort if images.json cannot be fetched: rebuild a bare list from
+  // the grid thumbnails so navigation still works (no captions).
+  function imagesFromGrid(){
+    var list = [];
+    var thumbs = document.querySelectorAll("a[data-image-index] img");
+    for(var i = 0; i < thumbs.length; i++){
+      var parts = (thumbs[i].getAttribute("src") || "").split("/");
+      list.push({ file: parts[parts.length-1] || "", caption: "", alt: thumbs[i].alt || "" });
+    }
+    return list;
+  }
+
+  function withImages(cb){
+    if(images){ cb(); return; }
+    if(pending){ pending.push(cb); return; }
+    pending = [cb];
+    var done = function(list){
+      images = list;
+      totalImages = images.length;
+      var callbacks = pending;
+      pending = null;
+      for(var i = 0; i < callbacks.length; i++){ callbacks[i](); }
+    };
+    fetch(imagesUrl, { credentials: "same-origin" })
+      .then(function(r){ if(!r.ok) throw new Error("HTTP " + r.status); return r.json(); })
+      .then(done)
+      .catch(function(e){ console.error("photo viewer: could not load " + imagesUrl, e); done(imagesFromGrid()); });
+  }
+
+  function originalUrl(img){ return "/_assets/images/photos/" + slug + "/originals/" + (img.file||""); }
+
+  function evict(index){
+    var pre = prefetched[index];
+    delete prefetched[index];
+    // Dropping src/srcset aborts an in-flight request and releases the bitmap
+    pre.removeAttribute("srcset");
+    pre.removeAttribute("src");
+  }
+
+  function decodeAhead(img){
+    var pre = new Image();
+    // Same sizes/srcset as #viewer-image so the browser picks the same candidate
+    pre.sizes = img.sizes || "";
+    pre.srcset = img.srcset || "";
+    pre.src = originalUrl(img);
+    if(pre.decode) pre.decode().catch(function(){});
+    return pre;
+  }
+
+  function prefetchAround(index){
+    if(!images) return;
+    var n = images.length;
+    var wanted = [];
+    // Forward neighbours first: that's the usual direction of travel
+    for(var d = 1; d <= prefetchWindow && d < n; d++){ wanted.push((index + d) % n); }
+    for(var d2 = 1; d2 <= prefetchWindow && d2 < n; d2++){ wanted.push((index - d2 + n) % n); }
+    var keep = {};
+    for(var i = 0; i < wanted.length; i++){ if(wanted[i] !== index) keep[wanted[i]] = true; }
+    for(var k in prefetched){ if(!keep[k]) evict(k); }
+    for(var j = 0; j < wanted.length; j++){
+      var w = wanted[j];
+      if(keep[w] && !prefetched[w] && images[w]) prefetched[w] = decodeAhead(images[w]);
+    }
+  }
+
+  function clearPrefetch(){ for(var k in prefetched){ evict(k); } }
+
+  function showGrid(){ clearPrefetch(); if(grid) grid.style.display="grid"; viewer.style.display="none"; viewer.classList.remove("active"); document.body.style.overflow="auto"; }
+  function showViewer(index){ currentIndex = index; if(grid) grid.style.display="none"; viewer.style.display="flex"; viewer.classList.add("active"); document.body.style.overflow="hidden"; loadPhoto(index); }
+
+  function loadPhoto(index){
+    currentIndex = index;
+    if(photoCounter) photoCounter.textContent = (index+1) + " / " + totalImages;
+    withImages(function(){
+      try{
+        // A later navigation may have superseded this request while the JSON loaded
+        if(index !== currentIndex) return;
+        var img = images[index];
+        if(!img) return;
+        var src = originalUrl(img);
+        if(viewerImage){ viewerImage.sizes = img.sizes || ""; viewerImage.srcset = img.srcset || ""; viewerImage.src = src; viewerImage.alt = img.alt || ""; }
+        if(captionText) captionText.textContent = img.caption || "";
+        if(photoCounter) photoCounter.textContent = (index+1) + " / " + totalImages;
+        prefetchAround(index);
+      }catch(e){ console.error("loadPhoto error", e); }
+    });
+  }
+
+  function go(index){ var hash = "#photo-" + (index+1); history.pushState({index:index}, "", hash); loadPhoto(index); }
+
+  window.navigatePrev = function(){ go(currentIndex===0 ? totalImages-1 : currentIndex-1); };
+  window.navigateNext = function(){ go(currentIndex===totalImages-1 ? 0 : currentIndex+1); };
+  window.closeViewer = function(){ try{ history.replaceState(null, "", window.location.pathname); showGrid(); }catch(e){} };
+  window.openPhoto = function(evt, num){ try{ if(evt && typeof evt.preventDefault === "function") evt.preventDefault(); var idx = (typeof num === "number") ? num-1 : (parseInt(num,10)-1); if(isNaN(idx)) idx = 0; history.pushState({index:idx}, "", "#photo-" + (idx+1)); showViewer(idx); }catch(e){ console.error("openPhoto error", e); } };
+
+  function handleHash(){
+    var hash = window.location.hash;
+    if(!hash || hash==="#"){ showGrid(); return; }
+    var m = hash.match(/#photo-(\d+)/);
+    if(m){ var num = parseInt(m[1],10); if(num>=1 && num<=totalImages){ showViewer(num-1); } else { showGrid(); } }
+  }
+
+  document.addEventListener("keydown", function(e){ try{ if(viewer.classList.contains("active") || viewer.style.display==="flex"){ if(e.key==="ArrowLeft") navigatePrev(); else if(e.key==="ArrowRight") navigateNext(); else if(e.key==="Escape") closeViewer(); } }catch(e){} });
+  window.addEventListener("hashchange", handleHash);
+  window.addEventListener("popstate", handleHash);
+  handleHash();
+  document.addEventListener("click", function(e){ try{ var a = e.target.closest && e.target.closest("a[data-image-index]"); if(a){ var idx = parseInt(a.getAttribute("data-image-index"),10)-1; if(!isNaN(idx)){ history.pushState({index:idx}, "", "#photo-" + (idx+1)); showViewer(idx); e.preventDefault(); } } }catch(e){} });
+})();
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""bench_markdown.py
+
+Throughput of generate_rss.markdown_to_html (single-pass block/inline
+converter) against a frozen copy of the regex-chain version it replaced,
+on the bodies of the project essays (projects/*/index.qmd).
+
+Each converter runs over the whole corpus --repeat times; the best run is
+reported as MB/s of markdown input.
+
+Usage:
+  python _scripts/bench_markdown.py              # 20 repeats
+  python _scripts/bench_markdown.py -r 50 --json
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from html import escape
+from pathlib import Path
+
+import content_model
+import generate_rss
+
+ROOT = Path(__file__).resolve().parents[1]
+SITE_URL = generate_rss.SITE_URL
+
+
+def legacy_markdown_to_html(text):
+    """generate_rss.markdown_to_html as of the regex-chain implementation."""
+    # Remove Quarto div syntax
+    text = re.sub(r':::\s*\{[^}]+\}\s*', '', text)
+    text = re.sub(r'^:::$', '', text, flags=re.MULTILINE)
+    # Remove HTML blocks
+    text = re.sub(r'```\{=html\}.*?```', '', text, flags=re.DOTALL)
+    # Remove code blocks but preserve their content as <pre><code>
+    def code_replacer(match):
+        code = match.group(1) if match.group(1) else match.group(0)
+        return f'<pre><code>{escape(code)}</code></pre>'
+    text = re.sub(r'```(?:[a-z]+)?\n(.*?)```', code_replacer, text, flags=re.DOTALL)
+    
+    # Convert headings
+    text = re.sub(r'^### (.+)$', r'<h3>\1</h3>', text, flags=re.MULTILINE)
+    text = re.sub(r'^## (.+)$', r'<h2>\1</h2>', text, flags=re.MULTILINE)
+    text = re.sub(r'^# (.+)$', r'<h1>\1</h1>', text, flags=re.MULTILINE)
+    
+    # Convert bold and italic
+    text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
+    text = re.sub(r'\*(.+?)\*', r'<em>\1</em>', text)
+    
+    # Convert links
+    text = re.sub(r'\[([^\]]+)\]\(([^\)]+)\)', r'<a href="\2">\1</a>', text)
+    
+    # Convert images to absolute URLs
+    text = re.sub(r'!\[([^\]]*)\]\((/[^\)]+)\)', rf'<img src="{SITE_URL}\2" alt="\1" />', text)
+    text = re.sub(r'!\[([^\]]*)\]\((\.\./[^\)]+)\)', lambda m: f'<img src="{SITE_URL}/{m.group(2).replace("../", "")}" alt="{m.group(1)}" />', text)
+    
+    # Convert paragraphs
+    lines = text.split('\n')
+    html_lines = []
+    in_paragraph = False
+    for line in lines:
+        line = line.strip()
+        if not line:
+            if in_paragraph:
+                html_lines.append('</p>')
+                in_paragraph = False
+        elif line.startswith('<h') or line.startswith('<pre>') or line.startswith('<img'):
+            if in_paragraph:
+                html_lines.append('</p>')
+                in_paragraph = False
+            html_lines.append(line)
+        else:
+            if not in_paragraph:
+                html_lines.append('<p>')
+                in_paragraph = True
+            else:
+                html_lines.append(' ')
+            html_lines.append(line)
+    if in_paragraph:
+        html_lines.append('</p>')
+    
+    text = ''.join(html_lines)
+    # Clean up excessive whitespace
+    text = re.sub(r'\n\n\n+', '\n\n', text)
+    return text.strip()
+
+
+def load_corpus():
+    """Markdown bodies of every project essay (front matter stripped)."""
+    bodies = []
+    for path in sorted((ROOT / "projects").glob("*/index.qmd")):
+        text = path.read_text(encoding="utf-8")
+        bodies.append(text[content_model.parse_text(text)["body_offset"]:])
+    return bodies
+
+
+def best_time(convert, bodies, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for body in bodies:
+            convert(body)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the RSS markdown converter")
+    parser.add_argument("--repeat", "-r", type=int, default=20, help="Runs per converter; best time is kept (default: 20)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    bodies = load_corpus()
+    if not bodies:
+        print("No project essays found under projects/", file=sys.stderr)
+        sys.exit(1)
+    size_mb = sum(len(b.encode("utf-8")) for b in bodies) / 1e6
+
+    converters = {
+        "legacy": legacy_markdown_to_html,
+        "current": generate_rss.markdown_to_html,
+    }
+    results = {}
+    for name, convert in converters.items():
+        seconds = best_time(convert, bodies, max(1, args.repeat))
+        results[name] = {"seconds": round(seconds, 6), "mb_per_s": round(size_mb / seconds, 2)}
+
+    summary = {
+        "documents": len(bodies),
+        "megabytes": round(size_mb, 4),
+        "results": results,
+        "speedup": round(results["legacy"]["seconds"] / results["current"]["seconds"], 2),
+    }
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"Corpus: {len(bodies)} essays, {size_mb * 1000:.1f} kB (best of {args.repeat})")
+    print(f"{'converter':<10}{'ms':>10}{'MB/s':>10}")
+    for name, r in results.items():
+        print(f"{name:<10}{r['seconds'] * 1000:>10.2f}{r['mb_per_s']:>10.2f}")
+    print(f"Speedup: {summary['speedup']}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""bench_scale.py
+
+Run every generator against a synthetic site at a chosen scale.
+
+A fixture is built in a temp directory: N photo collections of M generated
+JPEGs (with `_data/photos.yml`), K project essays, B bookmark cards, and a
+copy of `_scripts/` so each generator resolves its paths inside the
+fixture. Each generator then runs twice in a child process, cold (empty
+caches) and warm (nothing changed), and the harness records wall time, peak
+RSS (from the child's rusage) and the files/bytes it wrote.
+
+generate-projects.py only lists the essays named in its PROJECT_ORDER, so
+fixture essays reuse those names first; the rest are still read by
+calculate-reading-time.py and generate_rss.py.
+
+Usage:
+  python _scripts/bench_scale.py                        # 1x: 3 x 20 photos, 9 essays, 50 bookmarks
+  python _scripts/bench_scale.py --scale 10             # 10x every dimension
+  python _scripts/bench_scale.py -n 30 -m 100 --json    # machine-readable
+  python _scripts/bench_scale.py --scale 10 -o bench-10x.json
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+ROOT = SCRIPT_DIR.parent
+
+# (name, argv after the interpreter) in dependency order
+STEPS = [
+    # Serial (no --jobs): wait4() only sees the direct child's peak RSS
+    ("generate-thumbnails", ["_scripts/generate-thumbnails.py", "--formats", "jpeg,webp"]),
+    ("generate-photos", ["_scripts/generate-photos.py"]),
+    ("generate-bookmarks", ["_scripts/generate-bookmarks.py"]),
+    ("calculate-reading-time", ["_scripts/calculate-reading-time.py", "--all"]),
+    ("generate-projects", ["_scripts/generate-projects.py"]),
+    ("generate_rss", ["_scripts/generate_rss.py"]),
+]
+PASSES = ("cold", "warm")
+WORDS = ("climate carbon river city energy storage model policy emissions cooperation "
+         "welfare market science signal data region water heat grid battery").split()
+
+
+def project_names(count):
+    """PROJECT_ORDER names first (so generate-projects sees them), then extras."""
+    spec = importlib.util.spec_from_file_location("generate_projects", SCRIPT_DIR / "generate-projects.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.path.insert(0, str(SCRIPT_DIR))
+    spec.loader.exec_module(module)
+    names = list(module.PROJECT_ORDER[:count])
+    names += [f"essay-{i:04d}" for i in range(len(names), count)]
+    return names
+
+
+def sentence(rng, words=14):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def essay(rng, name, paragraphs):
+    """Markdown exercising the RSS converter: headings, lists, links, code, tables."""
+    out = [
+        "---",
+        f'title: "Essay {name}"',
+        f'description: "{sentence(rng, 10)}"',
+        'tag: "Synthetic"',
+        f'date: "2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"',
+        "---",
+        "",
+    ]
+    for i in range(paragraphs):
+        if i % 6 == 0:
+            out += [f"## Section {i // 6 + 1}", ""]
+        out += [" ".join(sentence(rng) for _ in range(5))
+                + f" See [source {i}](https://example.org/{name}/{i}) and **note {i}**.", ""]
+        if i % 5 == 2:
+            out += [f"- {sentence(rng, 6)}" for _ in range(4)] + [""]
+        if i % 9 == 4:
+            out += ["```python", f"value_{i} = {i} * 2", "```", ""]
+        if i % 11 == 7:
+            out += ["| a | b |", "|---|---|", f"| {i} | {i * 2} |", ""]
+    return "\n".join(out) + "\n"
+
+
+def build_fixture(root, collections, photos, essays, bookmarks, paragraphs, image_size):
+    """Write the synthetic site under `root`; returns a summary dict."""
+    # Imported here so the measuring parent never loads them (see main)
+    import yaml
+    from PIL import Image
+
+    rng = random.Random(1234)
+    shutil.copytree(SCRIPT_DIR, root / "_scripts", ignore=shutil.ignore_patterns("__pycache__", "archived"))
+    (root / "_assets" / "js").mkdir(parents=True)
+    shutil.copy2(ROOT / "_assets" / "js" / "photos-viewer.js", root / "_assets" / "js")
+
+    width, height = image_size
+    data = {"collections": []}
+    for c in range(collections):
+        slug = f"collection-{c:03d}"
+        originals = root / "_assets" / "images" / "photos" / slug / "originals"
+        originals.mkdir(parents=True)
+        images = []
+        for p in range(photos):
+            name = f"photo{p:04d}.jpg"
+            # A smooth random gradient plus noise compresses like a real photo
+            base = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+            noise = Image.effect_noise((width, height), 40).convert("RGB")
+            tint = Image.new("RGB", (width, height), tuple(rng.randrange(256) for _ in range(3)))
+            Image.blend(Image.blend(base, tint, 0.5), noise, 0.2).save(originals / name, quality=85)
+            images.append({"file": name, "caption": f"{slug} — Photo {p + 1}", "alt": f"{slug} photo {p + 1}"})
+        data["collections"].append({
+            "title": f"Collection {c}",
+            "slug": slug,
+            "date": "November 2025",
+            "month_year": "November 2025",
+            "location": "Synthetic",
+            "description": sentence(rng, 8),
+            "cover_image": images[0]["file"] if images else "",
+            "preview_images": [img["file"] for img in images[:3]],
+            "images": images,
+        })
+    (root / "_data").mkdir()
+    (root / "_data" / "photos.yml").write_text(yaml.safe_dump(data, allow_unicode=True), encoding="utf-8")
+
+    cards = [{
+        "id": f"shelf-{b:04d}",
+        "title": f"Shelf {b}",
+        "description": sentence(rng, 6),
+        "image": f"../_assets/images/bookmarks/shelf-{b:04d}.jpg",
+        "color_light": "blue-light",
+        "color_dark": "blue-dark",
+        "color_accent": "blue",
+        "colors": {"sidebar_bg": "#e8edf5", "footer_bg": "#1a2642"},
+    } for b in range(bookmarks)]
+    (root / "_data" / "bookmarks.yml").write_text(yaml.safe_dump({"bookmarks": cards}), encoding="utf-8")
+    (root / "bookmarks").mkdir()
+
+    for name in project_names(essays):
+        (root / "projects" / name).mkdir(parents=True)
+        (root / "projects" / name / "index.qmd").write_text(essay(rng, name, paragraphs), encoding="utf-8")
+
+    # Committed, so git_dates.py resolves dates the way it does in the repo
+    for cmd in (["init", "-q"], ["add", "-A"],
+                ["-c", "user.name=bench", "-c", "user.email=bench@localhost", "commit", "-qm", "fixture"]):
+        subprocess.run(["git", *cmd], cwd=root, capture_output=True)
+
+    return {"collections": collections, "photos_per_collection": photos, "essays": essays,
+            "bookmarks": bookmarks, "paragraphs_per_essay": paragraphs, "image_size": list(image_size)}
+
+
+def snapshot(root):
+    """{relative path: (size, mtime_ns)} for every file in the fixture."""
+    files = {}
+    for dirpath, dirs, names in os.walk(root):
+        dirs[:] = [d for d in dirs if d != ".git"]
+        for name in names:
+            st = os.stat(os.path.join(dirpath, name))
+            files[os.path.relpath(os.path.join(dirpath, name), root)] = (st.st_size, st.st_mtime_ns)
+    return files
+
+
+def run_step(root, argv, log):
+    """Run one generator; returns wall seconds, child peak RSS and exit code."""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, *argv], cwd=root, stdout=log, stderr=subprocess.STDOUT)
+    # wait4 gives this child's own rusage, not the sum over all children
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return {
+        "seconds": round(time.perf_counter() - start, 4),
+        # Linux reports ru_maxrss in KiB
+        "peak_rss_kib": usage.ru_maxrss,
+        "exit_code": proc.returncode,
+    }
+
+
+def run_benchmark(root):
+    results = {}
+    with open(root / "bench.log", "w") as log:
+        for run in PASSES:
+            for name, argv in STEPS:
+                before = snapshot(root)
+                result = run_step(root, argv, log)
+                after = snapshot(root)
+                written = [p for p, key in after.items() if before.get(p) != key and p != "bench.log"]
+                result["files_written"] = len(written)
+                result["bytes_written"] = sum(after[p][0] for p in written)
+                results.setdefault(name, {})[run] = result
+    return results
+
+
+def git_head():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the generators on a synthetic site")
+    parser.add_argument("--scale", "-s", type=float, default=1.0, help="Multiply every count below (default: 1)")
+    parser.add_argument("--collections", "-n", type=int, default=3, help="Photo collections (default: 3)")
+    parser.add_argument("--photos", "-m", type=int, default=20, help="JPEGs per collection (default: 20)")
+    parser.add_argument("--essays", "-k", type=int, default=9, help="Project essays (default: 9)")
+    parser.add_argument("--bookmarks", "-b", type=int, default=50, help="Bookmark cards (default: 50)")
+    parser.add_argument("--paragraphs", type=int, default=60, help="Paragraphs per essay (default: 60)")
+    parser.add_argument("--image-size", default="1200x800", help="Original JPEG size WxH (default: 1200x800)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--output", "-o", help="Also write the JSON results to this file")
+    parser.add_argument("--keep", action="store_true", help="Keep the fixture directory")
+    parser.add_argument("--child-fixture", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.image_size.lower().split("x"))
+    if args.child_fixture:
+        print(json.dumps(build_fixture(Path(args.child_fixture), args.collections, args.photos, args.essays,
+                                       args.bookmarks, args.paragraphs, (width, height))))
+        return
+
+    def scaled(n):
+        return max(1, round(n * args.scale))
+
+    tmp = Path(tempfile.mkdtemp(prefix="site-bench-"))
+    try:
+        start = time.perf_counter()
+        # Built in a child: a child's ru_maxrss starts from its parent's RSS
+        # at fork, so the harness itself must stay small
+        out = subprocess.run(
+            [sys.executable, __file__, "--child-fixture", str(tmp),
+             "-n", str(scaled(args.collections)), "-m", str(scaled(args.photos)),
+             "-k", str(scaled(args.essays)), "-b", str(scaled(args.bookmarks)),
+             "--paragraphs", str(args.paragraphs), "--image-size", f"{width}x{height}"],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        fixture = json.loads(out)
+        fixture["build_seconds"] = round(time.perf_counter() - start, 2)
+        results = run_benchmark(tmp)
+    finally:
+        if args.keep:
+            print(f"Fixture kept at {tmp}", file=sys.stderr)
+        else:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    summary = {"commit": git_head(), "scale": args.scale, "fixture": fixture, "results": results}
+    if args.output:
+        Path(args.output).write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"Fixture: {fixture['collections']} x {fixture['photos_per_collection']} photos, "
+              f"{fixture['essays']} essays, {fixture['bookmarks']} bookmarks "
+              f"(built in {fixture['build_seconds']}s)")
+        print(f"{'generator':<24}{'pass':<6}{'seconds':>9}{'peak RSS (MiB)':>16}{'files':>7}{'KiB written':>13}")
+        for name, runs in results.items():
+            for run, r in runs.items():
+                flag = "" if r["exit_code"] == 0 else f"  (exit {r['exit_code']})"
+                print(f"{name:<24}{run:<6}{r['seconds']:>9.3f}{r['peak_rss_kib'] / 1024:>16.1f}"
+                      f"{r['files_written']:>7}{r['bytes_written'] / 1024:>13.1f}{flag}")
+    if any(r["exit_code"] for runs in results.values() for r in runs.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""bench_thumbnails.py
+
+Compare the full-resolution and draft-mode decode paths of
+generate-thumbnails.py on one collection's originals.
+
+Each mode runs in its own child process so peak RSS (ru_maxrss) is measured
+in isolation; the best wall time over --repeat runs is reported.
+
+Usage:
+  python _scripts/bench_thumbnails.py                  # banaras, 3 repeats
+  python _scripts/bench_thumbnails.py -c patna -r 5
+  python _scripts/bench_thumbnails.py --json           # machine-readable
+"""
+
+import argparse
+import importlib.util
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+ROOT = SCRIPT_DIR.parent
+PHOTOS_DIR = ROOT / "_assets" / "images" / "photos"
+
+MODES = {"full": False, "draft": True}
+
+
+def load_generator():
+    """Import generate-thumbnails.py (the hyphen keeps it out of `import`)."""
+    spec = importlib.util.spec_from_file_location("generate_thumbnails", SCRIPT_DIR / "generate-thumbnails.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_mode(collection: str, mode: str, width: int, quality: int) -> dict:
+    """Thumbnail every original in `collection` into a temp dir (child process)."""
+    gen = load_generator()
+    gen.logging.disable(gen.logging.CRITICAL)
+    sources = sorted(
+        p for p in (PHOTOS_DIR / collection / "originals").iterdir()
+        if p.suffix.lower() in gen.EXTENSIONS
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        ok = sum(
+            gen.generate_thumbnail(src, Path(tmp) / (src.stem + ".jpg"), width, quality, MODES[mode])
+            for src in sources
+        )
+        elapsed = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "images": len(sources),
+        "created": ok,
+        "seconds": round(elapsed, 4),
+        # Linux reports ru_maxrss in KiB
+        "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark thumbnail decode paths")
+    parser.add_argument("--collection", "-c", default="banaras", help="Collection to benchmark (default: banaras)")
+    parser.add_argument("--repeat", "-r", type=int, default=3, help="Runs per mode; best time is kept (default: 3)")
+    parser.add_argument("--width", "-w", type=int, default=300, help="Thumbnail width (default: 300)")
+    parser.add_argument("--quality", "-q", type=int, default=85, help="JPEG quality (default: 85)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--child", choices=sorted(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args.collection, args.child, args.width, args.quality)))
+        return
+
+    if not (PHOTOS_DIR / args.collection / "originals").is_dir():
+        print(f"No originals for collection: {args.collection}", file=sys.stderr)
+        sys.exit(1)
+
+    results = {}
+    for mode in MODES:
+        runs = []
+        for _ in range(max(1, args.repeat)):
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", mode,
+                 "-c", args.collection, "-w", str(args.width), "-q", str(args.quality)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            runs.append(json.loads(out))
+        best = min(runs, key=lambda r: r["seconds"])
+        best["peak_rss_kib"] = max(r["peak_rss_kib"] for r in runs)
+        results[mode] = best
+
+    full, draft = results["full"], results["draft"]
+    summary = {
+        "collection": args.collection,
+        "results": results,
+        "speedup": round(full["seconds"] / draft["seconds"], 2) if draft["seconds"] else None,
+        "rss_saved_kib": full["peak_rss_kib"] - draft["peak_rss_kib"],
+    }
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"Collection: {args.collection} ({full['images']} originals, best of {args.repeat})")
+    print(f"{'mode':<8}{'seconds':>10}{'peak RSS (MiB)':>18}")
+    for mode, r in results.items():
+        print(f"{mode:<8}{r['seconds']:>10.3f}{r['peak_rss_kib'] / 1024:>18.1f}")
+    print(f"Draft speedup: {summary['speedup']}x, RSS saved: {summary['rss_saved_kib'] / 1024:.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""build.py
+
+Dependency-aware build for the site.
+
+Every `_scripts` step is declared below with the steps it depends on and
+the files it reads and writes. Steps whose dependencies are done run
+concurrently, and a step is skipped when its inputs and outputs are exactly
+as they were after its last successful run (fingerprints are kept in
+`.cache/build-state.json`). Files are fingerprinted by sha256, and a hash is
+reused from `.cache/file-hashes.json` while the file's size and mtime are
+unchanged, so an unchanged tree is checked with stat() alone. The run ends with per-step timings and the
+critical path, i.e. the chain of steps that bounded the wall time.
+
+The render step is scoped: after a first full render it runs a single
+`quarto render <page>...` for the pages whose source changed (by content
+hash, including pages the generators rewrote), plus the listing pages that
+summarise them and pages whose runtime data (photos/*/images.json) changed.
+A change to _quarto.yml, CSS, JS, filters, includes or a post-render
+script, a deleted page, or --force renders the whole site again
+(`.cache/render-state.json`).
+
+Usage:
+  python _scripts/build.py                  # generate (everything before render)
+  python _scripts/build.py build            # generate + quarto render + photo assets
+  python _scripts/build.py photos           # one step and what it depends on
+  python _scripts/build.py --force -j 2     # ignore saved state (full render), two steps at a time
+  python _scripts/build.py --dry-run        # show what would run, command by command
+  python _scripts/build.py --trace t.json   # one Chrome trace for every step (see tracing.py)
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import posixpath
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import tracing
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+ROOT = SCRIPT_DIR.parent
+STATE_FILE = ROOT / ".cache" / "build-state.json"
+# rel -> [size, mtime_ns, sha256]; a file is only re-hashed when its
+# size or mtime changes
+HASHES_FILE = ROOT / ".cache" / "file-hashes.json"
+PY = sys.executable
+
+_hashes = None
+_hashes_lock = threading.Lock()
+# Pruned from "**/" patterns
+EXCLUDED_DIRS = {"_site", ".cache", ".git", ".venv", "venv", ".quarto", "node_modules"}
+
+# name -> {"cmd", "deps", "inputs", "outputs"}; inputs/outputs are globs
+# relative to ROOT. A step's own script is always one of its inputs.
+STEPS = {
+    "thumbnails": {
+        "cmd": [PY, "_scripts/generate-thumbnails.py", "--jobs", "0", "--formats", "jpeg,webp,avif"],
+        "deps": [],
+        "inputs": ["_scripts/generate-thumbnails.py", "_assets/images/photos/*/originals/*"],
+        "outputs": ["_assets/images/photos/.thumbnails.json",
+                    "_assets/images/photos/*/thumbnails/*", "_assets/images/photos/*/sizes/*/*"],
+    },
+    "photos": {
+        "cmd": [PY, "_scripts/generate-photos.py"],
+        "deps": ["thumbnails"],
+        "inputs": ["_scripts/generate-photos.py", "_data/photos.yml",
+                   "_assets/images/photos/.thumbnails.json"],
+        "outputs": ["photos/index.qmd", "photos/*/index.qmd", "photos/*/images.json"],
+    },
+    "bookmarks": {
+        "cmd": [PY, "_scripts/generate-bookmarks.py"],
+        "deps": [],
+        "inputs": ["_scripts/generate-bookmarks.py", "_data/bookmarks.yml"],
+        "outputs": ["bookmarks/index.qmd"],
+    },
+    "reading-time": {
+        # Rewrites its inputs in place (only when the value changes)
+        "cmd": [PY, "_scripts/calculate-reading-time.py", "--all", "--jobs", "0"],
+        "deps": [],
+        "inputs": ["_scripts/calculate-reading-time.py", "_scripts/content_model.py",
+                   "projects/*/index.qmd", "now/index.qmd", "now/archive/*/index.qmd",
+                   "bookmarks/*/index.qmd"],
+        "outputs": [],
+    },
+    "projects": {
+        "cmd": [PY, "_scripts/generate-projects.py"],
+        # Reads the reading-time values written by reading-time
+        "deps": ["reading-time"],
+        "inputs": ["_scripts/generate-projects.py", "_scripts/content_model.py",
+                   "projects/*/index.qmd", "_assets/images/projects/*"],
+        "outputs": ["projects/index.qmd"],
+    },
+    "render": {
+        # generate_rss.py, create-404-redirect.sh, sync_assets.py and
+        # bundle_assets.py run as post-render hooks.
+        # Scoped: only changed pages are rendered (see render_scope)
+        "cmd": ["quarto", "render"],
+        "scoped": True,
+        "deps": ["photos", "bookmarks", "reading-time", "projects"],
+        "inputs": ["_quarto.yml", "**/*.qmd", "_assets/css/*", "_assets/js/*", "_filters/*",
+                   "_includes/*", "_data/*", "photos/*/images.json", "_scripts/generate_rss.py",
+                   "_scripts/feeds.py", "_scripts/sync_assets.py",
+                   "_scripts/bundle_assets.py", "_scripts/css_prune.py"],
+        "outputs": ["_site/index.html"],
+    },
+    "assets": {
+        # Also a post-render hook; this catches photo changes when no page
+        # needed rendering
+        "cmd": [PY, "_scripts/sync_assets.py"],
+        "deps": ["render", "thumbnails"],
+        "inputs": ["_scripts/sync_assets.py", "_assets/images/photos/*/originals/*",
+                   "_assets/images/photos/*/thumbnails/*", "_assets/images/photos/*/sizes/*/*"],
+        "outputs": [],
+    },
+}
+
+# Scoped render: a change to any of these re-renders the whole site
+# (including the post-render hooks: a scoped render with no changed pages
+# would never run them)
+RENDER_GLOBALS = ["_quarto.yml", "_assets/css/*", "_assets/js/*", "_filters/*", "_includes/*",
+                  "_scripts/generate_rss.py", "_scripts/feeds.py", "_scripts/sync_assets.py",
+                  "_scripts/bundle_assets.py", "_scripts/css_prune.py"]
+# Listing page -> pages it summarises; re-rendered when one of them changes
+LISTINGS = {
+    "projects/index.qmd": ["projects/*/index.qmd"],
+    "photos/index.qmd": ["photos/*/index.qmd"],
+}
+# Files a page fetches at runtime (pattern -> page next to them); a change
+# re-renders the page and copies the file into _site
+PAGE_RESOURCES = {"photos/*/images.json": "index.qmd"}
+RENDER_STATE_FILE = ROOT / ".cache" / "render-state.json"
+
+TARGETS = {
+    "generate": ["thumbnails", "photos", "bookmarks", "reading-time", "projects"],
+    "build": list(STEPS),
+}
+
+
+def walk(pattern):
+    """ROOT.glob() for "**/<name>" that prunes EXCLUDED_DIRS while walking."""
+    name = pattern[3:]
+    for dirpath, dirs, files in os.walk(ROOT):
+        dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+        for fn in fnmatch.filter(files, name):
+            yield Path(dirpath) / fn
+
+
+def expand(patterns):
+    """Sorted repo-relative paths matching `patterns` (files only)."""
+    found = set()
+    for pattern in patterns:
+        paths = walk(pattern) if pattern.startswith("**/") else ROOT.glob(pattern)
+        for path in paths:
+            if path.is_file():
+                found.add(path.relative_to(ROOT).as_posix())
+    return sorted(found)
+
+
+def file_print(rel):
+    """sha256 of a file, reused from HASHES_FILE while its size and mtime match."""
+    global _hashes
+    st = (ROOT / rel).stat()
+    with _hashes_lock:
+        if _hashes is None:
+            try:
+                with HASHES_FILE.open("r", encoding="utf-8") as fh:
+                    _hashes = json.load(fh)
+            except (OSError, ValueError):
+                _hashes = {}
+        cached = _hashes.get(rel)
+    if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+        return cached[2]
+    h = hashlib.sha256()
+    with (ROOT / rel).open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    with _hashes_lock:
+        _hashes[rel] = [st.st_size, st.st_mtime_ns, h.hexdigest()]
+    return h.hexdigest()
+
+
+def save_hashes():
+    """Write the file-hash cache, dropping files that no longer exist."""
+    with _hashes_lock:
+        if _hashes is None:
+            return
+        live = {rel: entry for rel, entry in _hashes.items() if (ROOT / rel).is_file()}
+    HASHES_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = HASHES_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(live, sort_keys=True), encoding="utf-8")
+    tmp.replace(HASHES_FILE)
+
+
+def fingerprint(step):
+    """Digest of the step's command plus every input and output file."""
+    h = hashlib.sha256(json.dumps(step["cmd"][1:]).encode())
+    for kind in ("inputs", "outputs"):
+        for rel in expand(step[kind]):
+            h.update(f"{kind} {rel} {file_print(rel)}\n".encode())
+    return h.hexdigest()
+
+
+def missing_outputs(step):
+    """True if a literal (non-glob) output is gone, e.g. after `rm -rf _site`."""
+    return any(not (ROOT / pattern).exists() for pattern in step["outputs"]
+               if not any(ch in pattern for ch in "*?["))
+
+
+def load_state():
+    try:
+        with STATE_FILE.open("r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state):
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=1, sort_keys=True), encoding="utf-8")
+    tmp.replace(STATE_FILE)
+
+
+def plan(names):
+    """The requested steps plus everything they depend on, in STEPS order."""
+    wanted = set()
+    stack = list(names)
+    while stack:
+        name = stack.pop()
+        if name not in wanted:
+            wanted.add(name)
+            stack.extend(STEPS[name]["deps"])
+    return [name for name in STEPS if name in wanted]
+
+
+def step_commands(step, scope):
+    """The commands a step runs, given its render_scope() (None if unscoped).
+
+    A scoped render is one `quarto render <page>...` invocation (none when no
+    page changed): Quarto runs the project's post-render hooks once per
+    invocation, so they run once per build however many pages changed.
+    """
+    if scope and scope["pages"] is not None:
+        return [[*step["cmd"], *scope["pages"]]] if scope["pages"] else []
+    return [step["cmd"]]
+
+
+def run_step(name, step, state, force):
+    """Run (or skip) one step; returns a result dict. Runs in a worker thread."""
+    with tracing.span(name, cat="step"):
+        return _run_step(name, step, state, force)
+
+
+def _run_step(name, step, state, force):
+    start = time.perf_counter()
+    with tracing.span("fingerprint", cat="step", step=name):
+        fresh = not force and not missing_outputs(step) and state.get(name) == fingerprint(step)
+    if fresh:
+        return {"name": name, "status": "skipped", "seconds": time.perf_counter() - start, "output": ""}
+    scope = render_scope(force) if step.get("scoped") else None
+    commands = step_commands(step, scope)
+    note = ""
+    if scope and scope["pages"] is not None:
+        note = f"Rendering {len(scope['pages'])} changed page(s): {', '.join(scope['pages']) or '-'}\n"
+    output, ok = [note], True
+    for cmd in commands:
+        try:
+            # Children inherit SITE_TRACE, so their spans join this trace
+            label = Path(cmd[1]).name if cmd[0] == PY else " ".join(cmd[:3])
+            with tracing.span(label, cat="command", step=name):
+                proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+        except OSError as e:
+            # e.g. quarto not installed
+            output.append(f"{cmd[0]}: {e}")
+            ok = False
+            break
+        output.append(proc.stdout + proc.stderr)
+        if proc.returncode != 0:
+            ok = False
+            break
+    result = {"name": name, "status": "ok" if ok else "failed", "output": "".join(output)}
+    if ok and scope:
+        finish_render(scope)
+    if ok:
+        # Taken after the run, so a step that rewrites its own inputs
+        # (reading-time) is clean next time
+        result["fingerprint"] = fingerprint(step)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+# --- scoped render ---------------------------------------------------------
+
+def render_scope(force):
+    """Work out what the render step has to do since the last render.
+
+    Returns {"state", "pages", "resources"}: "pages" is the sorted list of
+    .qmd files to render, or None when the whole site must be rendered (no
+    previous render, a RENDER_GLOBALS file changed, a page was deleted or
+    --force); "resources" lists changed PAGE_RESOURCES files to copy.
+    """
+    pages = {rel: file_print(rel) for rel in expand(["**/*.qmd"])}
+    resources = {rel: file_print(rel) for rel in expand(list(PAGE_RESOURCES))}
+    h = hashlib.sha256()
+    for rel in expand(RENDER_GLOBALS):
+        h.update(f"{rel} {file_print(rel)}\n".encode())
+    state = {"globals": h.hexdigest(), "pages": pages, "resources": resources}
+    scope = {"state": state, "pages": None, "resources": sorted(resources)}
+
+    try:
+        with RENDER_STATE_FILE.open("r", encoding="utf-8") as fh:
+            old = json.load(fh)
+    except (OSError, ValueError):
+        return scope
+    if (force or old.get("globals") != state["globals"]
+            or not (ROOT / "_site" / "index.html").exists()
+            or set(old.get("pages", {})) - set(pages)):
+        return scope
+
+    changed = {rel for rel, digest in pages.items() if old["pages"].get(rel) != digest}
+    scope["resources"] = [rel for rel, digest in sorted(resources.items())
+                          if old.get("resources", {}).get(rel) != digest]
+    for rel in scope["resources"]:
+        pattern = next(p for p in PAGE_RESOURCES if fnmatch.fnmatch(rel, p))
+        page = posixpath.join(posixpath.dirname(rel), PAGE_RESOURCES[pattern])
+        if page in pages:
+            changed.add(page)
+    for listing, patterns in LISTINGS.items():
+        if listing in pages and any(fnmatch.fnmatch(rel, p) for rel in changed for p in patterns):
+            changed.add(listing)
+    scope["pages"] = sorted(changed)
+    return scope
+
+
+def finish_render(scope):
+    """Copy changed runtime resources into _site and remember what was rendered."""
+    for rel in scope["resources"]:
+        dst = ROOT / "_site" / rel
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(ROOT / rel, dst)
+    RENDER_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = RENDER_STATE_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(scope["state"], indent=1, sort_keys=True), encoding="utf-8")
+    tmp.replace(RENDER_STATE_FILE)
+
+
+def critical_path(order, results):
+    """(steps, seconds) of the longest dependency chain by measured time."""
+    finish, via = {}, {}
+    for name in order:
+        deps = [d for d in STEPS[name]["deps"] if d in finish]
+        prev = max(deps, key=lambda d: finish[d], default=None)
+        finish[name] = (finish[prev] if prev else 0.0) + results[name]["seconds"]
+        via[name] = prev
+    name = max(finish, key=finish.get)
+    total = finish[name]
+    path = []
+    while name:
+        path.append(name)
+        name = via[name]
+    return path[::-1], total
+
+
+def run(order, jobs, force):
+    """Run `order` as a DAG with up to `jobs` steps at once; returns results."""
+    state = load_state()
+    results = {}
+    pending = list(order)
+    running = {}
+    failed = False
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            if not failed:
+                for name in list(pending):
+                    deps = [d for d in STEPS[name]["deps"] if d in order]
+                    if len(running) < jobs and all(d in results for d in deps):
+                        pending.remove(name)
+                        print(f"▶ {name}", flush=True)
+                        running[pool.submit(run_step, name, STEPS[name], state, force)] = name
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                del running[future]
+                result = future.result()
+                results[result["name"]] = result
+                if result["output"].strip():
+                    print(result["output"].rstrip())
+                print(f"{'✖' if result['status'] == 'failed' else '✔'} {result['name']} "
+                      f"({result['status']}, {result['seconds']:.2f}s)", flush=True)
+                if "fingerprint" in result:
+                    state[result["name"]] = result["fingerprint"]
+                    save_state(state)
+                elif result["status"] == "failed":
+                    state.pop(result["name"], None)
+                    failed = True
+    save_hashes()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the site as a dependency graph of steps")
+    parser.add_argument("targets", nargs="*", default=["generate"],
+                        help=f"Targets ({', '.join(TARGETS)}) or step names (default: generate)")
+    parser.add_argument("--jobs", "-j", type=int, default=0,
+                        help="Steps to run at once; 0 means one per CPU (default: 0)")
+    parser.add_argument("--force", "-f", action="store_true", help="Run every step, ignoring saved state")
+    parser.add_argument("--dry-run", "-n", action="store_true", help="Show which steps would run")
+    parser.add_argument("--trace", metavar="OUT.json",
+                        help="Write one Chrome trace for the build and every step it runs "
+                             "(same as SITE_TRACE=OUT.json)")
+    args = parser.parse_args()
+    tracing.configure(args.trace)
+
+    names = []
+    for target in args.targets:
+        if target in TARGETS:
+            names.extend(TARGETS[target])
+        elif target in STEPS:
+            names.append(target)
+        else:
+            parser.error(f"unknown target: {target} (choose from {', '.join([*TARGETS, *STEPS])})")
+    order = plan(names)
+
+    if args.dry_run:
+        state = load_state()
+        for name in order:
+            step = STEPS[name]
+            stale = args.force or missing_outputs(step) or state.get(name) != fingerprint(step)
+            deps = ", ".join(step["deps"]) or "-"
+            print(f"{name:<14}{'run' if stale else 'skip':<6}after: {deps}")
+            if stale:
+                scope = render_scope(args.force) if step.get("scoped") else None
+                for cmd in step_commands(step, scope) or [["(no pages changed)"]]:
+                    print(f"{'':<14}$ {' '.join('python' if c == PY else c for c in cmd)}")
+        save_hashes()
+        return
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    start = time.perf_counter()
+    results = run(order, jobs, args.force)
+    wall = time.perf_counter() - start
+
+    print(f"\n{'step':<14}{'status':<9}{'seconds':>8}")
+    for name in order:
+        r = results.get(name)
+        status, seconds = (r["status"], f"{r['seconds']:.2f}") if r else ("not run", "-")
+        print(f"{name:<14}{status:<9}{seconds:>8}")
+    if len(results) == len(order):
+        path, total = critical_path(order, results)
+        print(f"Critical path: {' → '.join(path)} = {total:.2f}s (wall {wall:.2f}s)")
+    if any(r["status"] == "failed" for r in results.values()) or len(results) != len(order):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
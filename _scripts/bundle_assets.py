@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""bundle_assets.py
+
+Fingerprint and bundle the site's own CSS and JS after a render.
+
+Every page links the seven stylesheets listed under `format.html.css` in
+_quarto.yml and loads `_assets/js/*.js` through the include-before/after
+blocks, one request per file and under names that never change (so they
+can only be cached with revalidation). As a Quarto post-render hook this
+script:
+
+  - replaces each run of consecutive `<link rel="stylesheet">` tags
+    pointing into `_assets/css` with one link to a bundle of those files, in
+    the same order, minified (comments and redundant whitespace dropped),
+    written to `_assets/bundles/<name>.<sha256[:10]>.css` (the name changes
+    exactly when the content does);
+  - points each `<script src>` into `_assets/js` at a byte-for-byte copy
+    under the same kind of hashed name. Scripts are not concatenated, so an
+    error in one still leaves the others running, and not minified, since
+    that needs a real JS parser;
+  - prunes each page's CSS bundle to the rules that can match its DOM
+    (css_prune.py), inlines the subset that can match above the fold in a
+    <style> and loads the rest through a non-blocking preload link (with a
+    <noscript> fallback); pages with the same rules share one hashed file.
+    Bundles are built in memory and only those a rewritten page still links
+    are written: a whole CSS bundle is never written just to be pruned;
+  - writes `_site/_headers` (Cloudflare Pages / Netlify) marking bundles
+    `immutable` for a year and HTML as revalidate-on-every-request.
+
+Scripts with extra attributes (`defer`, a `?v=` query, as the photo viewer
+uses) and Quarto's own `site_libs` are left alone. On a partial render only
+the pages Quarto just wrote ($QUARTO_PROJECT_OUTPUT_FILES) are rewritten;
+a full render also deletes bundles no page references any more.
+
+Usage:
+  python _scripts/bundle_assets.py              # post-render hook, or by hand on _site
+  python _scripts/bundle_assets.py --all        # rewrite every page
+  python _scripts/bundle_assets.py --keep-css   # whole bundles, no per-page CSS
+  python _scripts/bundle_assets.py --all --fold 20  # inline less critical CSS
+"""
+
+import argparse
+import hashlib
+import os
+import posixpath
+import re
+from pathlib import Path
+
+import css_prune
+import tracing
+
+ROOT = Path(__file__).resolve().parents[1]
+BUNDLE_DIR = "_assets/bundles"
+HASH_LEN = 10
+
+# A relative (../, ./) or root-absolute prefix, then a file in _assets/css|js
+# with no query string or extra attributes
+PREFIX = r'(/|(?:\.\.?/)*)'
+CSS_TAG = rf'<link rel="stylesheet" href="{PREFIX}(_assets/css/[\w.-]+\.css)"\s*/?>'
+JS_TAG = rf'<script src="{PREFIX}(_assets/js/[\w.-]+\.js)"></script>'
+CSS_RUN = re.compile(rf'{CSS_TAG}(?:\s*{CSS_TAG})*')
+# A bundle link not already split into inline + deferred CSS
+BUNDLE_CSS_LINK = re.compile(rf'(?<!<noscript>)<link rel="stylesheet" href="{PREFIX}'
+                             rf'({re.escape(BUNDLE_DIR)}/[\w.-]+\.css)">')
+BUNDLE_REF = re.compile(rf'{re.escape(BUNDLE_DIR)}/[\w.-]+\.(?:css|js)')
+
+CSS_STRING = r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''
+CSS_TOKENS = re.compile(rf'({CSS_STRING})|/\*.*?\*/|\s+', re.S)
+CSS_PUNCT = re.compile(rf'({CSS_STRING})|;\s*(?=}})|\s*([{{}};,>])\s*|:\s+')
+CSS_URL = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+HEADERS = """\
+# Generated by _scripts/bundle_assets.py
+/
+  Cache-Control: public, max-age=0, must-revalidate
+
+/*/
+  Cache-Control: public, max-age=0, must-revalidate
+
+/*.html
+  Cache-Control: public, max-age=0, must-revalidate
+
+/{bundles}/*
+  Cache-Control: public, max-age=31536000, immutable
+"""
+
+
+def minify_css(text):
+    """Drop comments and whitespace that CSS ignores; strings are kept as-is."""
+    text = CSS_TOKENS.sub(lambda m: m.group(1) or ("" if m.group(0).startswith("/*") else " "), text)
+
+    def punct(m):
+        if m.group(1):
+            return m.group(1)
+        if m.group(2):
+            return m.group(2)
+        return ":" if m.group(0).startswith(":") else ""
+    return CSS_PUNCT.sub(punct, text).strip()
+
+
+def rebase_urls(css, src_dir, dst_dir=BUNDLE_DIR):
+    """Point relative url()s in CSS from `src_dir` at the same files from
+    `dst_dir` (both site-relative), or root-absolute when `dst_dir` is None."""
+    def fix(m):
+        url = m.group(2).strip()
+        if re.match(r'(?:[a-z]+:|/|#)', url, re.I):
+            return m.group(0)
+        target = posixpath.normpath(posixpath.join(src_dir, url))
+        url = "/" + target if dst_dir is None else posixpath.relpath(target, dst_dir)
+        return f'url("{url}")'
+    return CSS_URL.sub(fix, css)
+
+
+def build_bundle(site, files, kind, built):
+    """The bundle for `files` (site-relative, in order); returns its path.
+
+    Only its bytes are kept, in built["data"] (built["runs"] caches bundles
+    already built in this run); write_linked() writes it once a page links it.
+    """
+    key = (kind, tuple(files))
+    if key in built["runs"]:
+        return built["runs"][key]
+    if kind == "css":
+        parts = [rebase_urls(minify_css((site / f).read_text(encoding="utf-8")), posixpath.dirname(f))
+                 for f in files]
+        data = ("\n".join(parts) + "\n").encode("utf-8")
+    else:
+        data = (site / files[0]).read_bytes()
+    stem = Path(files[0]).stem if len(files) == 1 else "site"
+    rel = hashed_name(stem, kind, data)
+    built["runs"][key] = rel
+    built["data"][rel] = data
+    return rel
+
+
+def hashed_name(stem, kind, data):
+    """BUNDLE_DIR/<stem>.<sha256[:HASH_LEN]>.<kind> for `data` (bytes)."""
+    return f"{BUNDLE_DIR}/{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LEN]}.{kind}"
+
+
+def write_linked(site, html, built):
+    """Write the built bundles `html` links to; returns every bundle it links."""
+    linked = set(BUNDLE_REF.findall(html))
+    for rel in sorted(linked):
+        path = site / rel
+        # Content-addressed: an existing file already has these bytes
+        if rel in built["data"] and not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(built["data"][rel])
+            tmp.replace(path)
+    return linked
+
+
+def bundleable(site, files):
+    """A run can be merged if every file exists and no later stylesheet needs
+    to stay first (@import/@charset only work at the top of a file)."""
+    for i, rel in enumerate(files):
+        path = site / rel
+        if not path.is_file():
+            return False
+        if i and rel.endswith(".css") and re.search(r'@(?:import|charset)\b',
+                                                    path.read_text(encoding="utf-8")):
+            return False
+    return True
+
+
+def script_loader(site, path, scripts, built):
+    """src -> source text for scripts `path` loads (`scripts` caches files;
+    bundles built in this run but not yet written come from `built`)."""
+    def load(src):
+        src = src.split("?")[0].split("#")[0]
+        if re.match(r'(?:[a-z]+:)?//', src, re.I):
+            return ""
+        file = (site / src.lstrip("/")) if src.startswith("/") else (path.parent / src)
+        file = file.resolve()
+        if file not in scripts:
+            rel = posixpath.relpath(file.as_posix(), site.resolve().as_posix())
+            if rel in built["data"]:
+                scripts[file] = built["data"][rel].decode("utf-8", errors="replace")
+                return scripts[file]
+            try:
+                scripts[file] = file.read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                scripts[file] = ""
+        return scripts[file]
+    return load
+
+
+def split_css(site, path, html, built, split):
+    """Replace each bundle stylesheet link with the page's critical rules
+    inlined plus a non-blocking link to the rules the page can use."""
+    page = None
+    sizes = [0, 0, 0]
+
+    def replace(m):
+        nonlocal page
+        prefix, rel = m.groups()
+        if rel in built["data"]:
+            css = built["data"][rel].decode("utf-8")
+        else:
+            css = (site / rel).read_text(encoding="utf-8")
+        if page is None:
+            with tracing.span("inventory", cat="css", page=path.name):
+                page = css_prune.inventory(html, script_loader(site, path, split["scripts"], built),
+                                           split["fold"])
+        with tracing.span("prune", cat="css", bundle=rel):
+            used, critical = css_prune.prune(css, page)
+        if "</" in critical:
+            return m.group(0)
+        sizes[0] += len(css.encode("utf-8"))
+        sizes[1] += len(critical.encode("utf-8"))
+        # Inlined, the rules resolve url()s against the page, not the bundle
+        # dir; pages that link assets root-absolute get root-absolute urls
+        page_dir = posixpath.dirname(path.relative_to(site).as_posix()) or "."
+        inline = rebase_urls(critical, BUNDLE_DIR, None if prefix == "/" else page_dir)
+        if critical == used:
+            # Everything the page uses is critical: no second request
+            return f'<style>{inline}</style>'
+        sizes[2] += len(used.encode("utf-8"))
+        data = used.encode("utf-8")
+        href = prefix + hashed_name(Path(rel).name.split(".")[0], "css", data)
+        built["data"][href[len(prefix):]] = data
+        return (f'<style>{inline}</style>\n'
+                f'<link rel="preload" href="{href}" as="style" '
+                f'onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+                f'<noscript><link rel="stylesheet" href="{href}"></noscript>')
+
+    html = BUNDLE_CSS_LINK.sub(replace, html)
+    if sizes[0]:
+        split["report"].append((path.relative_to(site).as_posix(), *sizes))
+    return html
+
+
+def rewrite_page(site, path, built, stats, split=None):
+    """Swap asset tags in one HTML file for bundle tags; returns the bundles
+    the page links.
+
+    With `split` ({"scripts", "report", "fold"}), bundle stylesheets are then
+    pruned to what the page uses and their critical part inlined. Only the
+    bundles the final page links are written.
+    """
+    html = path.read_text(encoding="utf-8")
+    saved = [0]
+
+    def replace_css(m):
+        tags = re.findall(CSS_TAG, m.group(0))
+        prefixes = {prefix for prefix, _ in tags}
+        files = [rel for _, rel in tags]
+        if len(prefixes) != 1 or not bundleable(site, files):
+            return m.group(0)
+        saved[0] += len(files) - 1
+        rel = prefixes.pop() + build_bundle(site, files, "css", built)
+        return f'<link rel="stylesheet" href="{rel}">'
+
+    def replace_js(m):
+        prefix, rel = m.groups()
+        if not bundleable(site, [rel]):
+            return m.group(0)
+        return f'<script src="{prefix}{build_bundle(site, [rel], "js", built)}"></script>'
+
+    new = CSS_RUN.sub(replace_css, html)
+    new = re.sub(JS_TAG, replace_js, new)
+    if split is not None:
+        new = split_css(site, path, new, built, split)
+    linked = write_linked(site, new, built)
+    if new != html:
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(new, encoding="utf-8")
+        tmp.replace(path)
+        stats["pages"] += 1
+        stats["requests_saved"] = max(stats["requests_saved"], saved[0])
+    return linked
+
+
+def target_pages(site, rewrite_all):
+    """HTML files to rewrite: what Quarto just wrote, or every page."""
+    listed = os.environ.get("QUARTO_PROJECT_OUTPUT_FILES", "")
+    if rewrite_all or os.environ.get("QUARTO_PROJECT_RENDER_ALL") == "1" or not listed.strip():
+        return sorted(site.rglob("*.html")), True
+    pages = []
+    for line in listed.splitlines():
+        path = (ROOT / line.strip()).resolve()
+        if path.suffix == ".html" and path.is_file():
+            pages.append(path)
+    return sorted(pages), False
+
+
+def write_headers(site):
+    path = site / "_headers"
+    text = HEADERS.format(bundles=BUNDLE_DIR)
+    if not path.exists() or path.read_text(encoding="utf-8") != text:
+        path.write_text(text, encoding="utf-8")
+
+
+def prune(site, referenced):
+    """Delete bundles no page links to; returns how many."""
+    removed = 0
+    for path in sorted((site / BUNDLE_DIR).glob("*")):
+        if path.relative_to(site).as_posix() not in referenced:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bundle and fingerprint the site's CSS and JS")
+    parser.add_argument("--out-dir", help="Site directory (default: $QUARTO_PROJECT_OUTPUT_DIR or _site)")
+    parser.add_argument("--all", action="store_true",
+                        help="Rewrite every page, not just the ones Quarto just rendered")
+    parser.add_argument("--keep-css", action="store_true",
+                        help="Link whole CSS bundles; skip per-page pruning and critical inlining")
+    parser.add_argument("--fold", type=int, default=css_prune.FOLD_ELEMENTS, metavar="N",
+                        help="Elements of <body>, in document order, whose rules are inlined as "
+                             f"critical CSS (default: {css_prune.FOLD_ELEMENTS})")
+    parser.add_argument("--trace", metavar="OUT.json",
+                        help="Write a Chrome trace of this run (same as SITE_TRACE=OUT.json)")
+    args = parser.parse_args()
+    tracing.configure(args.trace)
+
+    site = ROOT / (args.out_dir or os.environ.get("QUARTO_PROJECT_OUTPUT_DIR") or "_site")
+    if not site.is_dir():
+        print(f"Site directory {site} not found; nothing to bundle.")
+        return
+
+    pages, whole_site = target_pages(site, args.all)
+    built = {"runs": {}, "data": {}}
+    stats = {"pages": 0, "requests_saved": 0}
+    referenced = set()
+    report = []
+    split = None if args.keep_css else {"scripts": {}, "report": report, "fold": args.fold}
+    with tracing.span("bundle assets", cat="assets", pages=len(pages)):
+        for path in pages:
+            referenced |= rewrite_page(site, path, built, stats, split)
+        write_headers(site)
+        removed = prune(site, referenced) if whole_site else 0
+    # Whole bundles that some page still links (pruned ones never hit disk)
+    sizes = {}
+    for (_, files), rel in built["runs"].items():
+        if rel in referenced:
+            before = sum((site / f).stat().st_size for f in files)
+            sizes[rel] = (len(files), before, len(built["data"][rel]))
+    tracing.counter("asset bundles", bundles=len(sizes), pages=stats["pages"])
+
+    for rel, (count, before, after) in sorted(sizes.items()):
+        print(f"  {rel}: {count} files, {before / 1024:.1f} KiB -> {after / 1024:.1f} KiB")
+    print(f"Bundled assets: {len(sizes)} bundles, {stats['pages']} of {len(pages)} pages rewritten, "
+          f"up to {stats['requests_saved']} fewer requests per page, {removed} stale bundles removed")
+    if report:
+        print("Per-page CSS (bundle -> inlined critical + deferred rest of what the page uses):")
+        for rel, before, critical, deferred in report:
+            print(f"  {rel}: {before / 1024:.1f} KiB -> {critical / 1024:.1f} KiB + {deferred / 1024:.1f} KiB")
+        before, critical, deferred = (sum(r[i] for r in report) for i in (1, 2, 3))
+        print(f"Pruned CSS on {len(report)} pages: {before / 1024:.1f} KiB -> {critical / 1024:.1f} KiB "
+              f"inlined + {deferred / 1024:.1f} KiB deferred")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,36 +4,34 @@ Calculate estimated reading time for .qmd files and add/update reading-time fiel
 in front matter.
 
 Usage:
-  python calculate-reading-time.py [file.qmd]          # Single file
-  python calculate-reading-time.py --all               # All project files
+  python calculate-reading-time.py [file.qmd ...]      # Specific files
+  python calculate-reading-time.py --all               # Projects, now/ and bookmark pages
   python calculate-reading-time.py --dir projects/     # Specific directory
+  python calculate-reading-time.py --all --jobs 0      # One worker per CPU
+
+Front matter and word counts come from the shared content model
+(content_model.py), so unchanged files are not re-parsed, and a file whose
+reading time is already correct is not rewritten (its mtime is kept, so
+Quarto does not re-render it).
 """
+import argparse
 import os
-import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import content_model
+import tracing
+
 ROOT = Path(__file__).parent.parent
 WORDS_PER_MINUTE = 200  # Average reading speed
-
-
-def count_words(text):
-    """Count words in markdown text, excluding code blocks and front matter."""
-    # Remove code blocks
-    text = re.sub(r'```.*?```', '', text, flags=re.DOTALL)
-    # Remove inline code
-    text = re.sub(r'`[^`]+`', '', text)
-    # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
-    # Remove URLs
-    text = re.sub(r'https?://[^\s]+', '', text)
-    # Remove markdown links but keep text
-    text = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', text)
-    # Remove images
-    text = re.sub(r'!\[[^\]]*\]\([^\)]+\)', '', text)
-    # Count words
-    words = re.findall(r'\b\w+\b', text)
-    return len(words)
+# Pages covered by --all, relative to ROOT
+ALL_PATTERNS = [
+    'projects/*/index.qmd',
+    'now/index.qmd',
+    'now/archive/*/index.qmd',
+    'bookmarks/*/index.qmd',
+]
 
 
 def calculate_reading_time(word_count):
@@ -42,32 +40,6 @@ def calculate_reading_time(word_count):
     return minutes
 
 
-def parse_qmd_file(filepath):
-    """Parse .qmd file and return (front_matter_lines, body, front_matter_dict)."""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Match front matter
-    match = re.match(r'^---\n(.*?)\n---\n(.*)$', content, re.DOTALL)
-    if not match:
-        return [], content, {}
-    
-    fm_text = match.group(1)
-    body = match.group(2)
-    fm_lines = fm_text.split('\n')
-    
-    # Parse simple key-value pairs
-    fm_dict = {}
-    for line in fm_lines:
-        if ':' in line:
-            key, value = line.split(':', 1)
-            key = key.strip()
-            value = value.strip().strip('"\'')
-            fm_dict[key] = value
-    
-    return fm_lines, body, fm_dict
-
-
 def update_front_matter(fm_lines, reading_time):
     """Update or add reading-time field in front matter lines."""
     # Check if reading-time already exists
@@ -99,73 +71,124 @@ def update_front_matter(fm_lines, reading_time):
     return new_lines
 
 
-def process_file(filepath):
-    """Process a single .qmd file and add reading time."""
-    print(f"Processing: {filepath}")
-    
-    fm_lines, body, fm_dict = parse_qmd_file(filepath)
-    
+def process_file(filepath, cache):
+    """Add or refresh the reading time of one .qmd file.
+
+    Returns a result dict: path, status ("changed", "unchanged" or
+    "skipped"), words, minutes and the file's content model.
+    """
+    with tracing.span("reading time", cat="reading-time", path=str(filepath)):
+        return _process_file(filepath, cache)
+
+
+def _process_file(filepath, cache):
+    doc = content_model.parse(filepath, cache)
+    fm_lines = doc["fm_lines"]
+    result = {"path": str(filepath), "status": "skipped", "words": 0, "minutes": 0, "doc": doc}
+
     if not fm_lines:
-        print(f"  ⚠️  No front matter found, skipping")
-        return
-    
-    word_count = count_words(body)
+        return result
+
+    word_count = doc["word_count"]
     reading_time = calculate_reading_time(word_count)
-    
-    print(f"  📊 Words: {word_count}, Reading time: {reading_time} min")
-    
-    # Update front matter
+    result.update(words=word_count, minutes=reading_time)
+
     new_fm_lines = update_front_matter(fm_lines, reading_time)
-    
+    if new_fm_lines == fm_lines:
+        # Already correct: leave the file (and its mtime) alone
+        result["status"] = "unchanged"
+        return result
+
     # Reconstruct file
-    new_content = '---\n' + '\n'.join(new_fm_lines) + '\n---\n' + body
-    
+    new_content = '---\n' + '\n'.join(new_fm_lines) + '\n---\n' + content_model.read_body(doc)
+
     # Write back
     with open(filepath, 'w', encoding='utf-8') as f:
         f.write(new_content)
-    
-    print(f"  ✅ Updated with reading time: {reading_time} min")
+    result.update(status="changed", doc=content_model.store(filepath, new_content, cache))
+    return result
+
+
+# Per-worker content model cache, loaded once by _init_worker
+_worker_cache = None
+
+
+def _init_worker():
+    global _worker_cache
+    _worker_cache = content_model.load_cache()
+
+
+def _process_in_worker(filepath):
+    return process_file(filepath, _worker_cache)
+
+
+def process_files(files, cache, jobs):
+    """Process `files`, in a pool of `jobs` workers when that helps."""
+    if jobs <= 1 or len(files) <= 1:
+        return [process_file(f, cache) for f in files]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(files)), initializer=_init_worker) as pool:
+        results = list(pool.map(_process_in_worker, files))
+    # Workers parsed with their own cache copies; fold their models back in
+    for result in results:
+        content_model.remember(result["doc"], cache)
+    return results
+
+
+def report(results):
+    icons = {"changed": "✅", "unchanged": "·", "skipped": "⚠️ "}
+    for r in results:
+        if r["status"] == "skipped":
+            print(f"  {icons['skipped']} {r['doc']['path']}: no front matter, skipped")
+        else:
+            print(f"  {icons[r['status']]} {r['doc']['path']}: {r['words']} words, {r['minutes']} min ({r['status']})")
+    counts = {status: sum(1 for r in results if r["status"] == status) for status in icons}
+    print(f"Reading time: {counts['changed']} changed, {counts['unchanged']} unchanged, "
+          f"{counts['skipped']} skipped")
 
 
 def find_qmd_files(directory):
     """Find all .qmd files in directory recursively."""
-    return list(Path(directory).rglob('*.qmd'))
+    return sorted(Path(directory).rglob('*.qmd'))
+
+
+def find_all_files():
+    """Every page --all covers (see ALL_PATTERNS)."""
+    return sorted({p for pattern in ALL_PATTERNS for p in ROOT.glob(pattern)})
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage:")
-        print("  python calculate-reading-time.py [file.qmd]")
-        print("  python calculate-reading-time.py --all")
-        print("  python calculate-reading-time.py --dir projects/")
-        sys.exit(1)
-    
-    arg = sys.argv[1]
-    
-    if arg == '--all':
-        # Process all projects
-        files = find_qmd_files(ROOT / 'projects')
-        print(f"Found {len(files)} .qmd files in projects/")
-        for f in files:
-            if f.name != 'index.qmd' or 'projects/' not in str(f):
-                continue
-            process_file(f)
-    elif arg == '--dir':
-        if len(sys.argv) < 3:
-            print("Error: --dir requires a directory path")
-            sys.exit(1)
-        directory = ROOT / sys.argv[2]
+    parser = argparse.ArgumentParser(description="Add/update reading-time in .qmd front matter")
+    parser.add_argument("files", nargs="*", help=".qmd files to process")
+    parser.add_argument("--all", action="store_true", help="Project, now/ and bookmark pages")
+    parser.add_argument("--dir", help="Process every .qmd under this directory")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Worker processes to use; 0 means one per CPU (default: 1)")
+    parser.add_argument("--trace", metavar="OUT.json",
+                        help="Write a Chrome trace of this run (same as SITE_TRACE=OUT.json)")
+    args = parser.parse_args()
+    tracing.configure(args.trace)
+
+    if args.all:
+        files = find_all_files()
+        print(f"Found {len(files)} .qmd files in projects/, now/ and bookmarks/")
+    elif args.dir:
+        directory = ROOT / args.dir
         files = find_qmd_files(directory)
-        print(f"Found {len(files)} .qmd files in {sys.argv[2]}")
-        for f in files:
-            process_file(f)
-    else:
-        # Process single file
-        filepath = Path(arg)
-        if not filepath.exists():
-            print(f"Error: File not found: {filepath}")
+        print(f"Found {len(files)} .qmd files in {args.dir}")
+    elif args.files:
+        files = [Path(f) for f in args.files]
+        missing = [f for f in files if not f.exists()]
+        if missing:
+            print(f"Error: File not found: {missing[0]}")
             sys.exit(1)
-        process_file(filepath)
+    else:
+        parser.print_usage()
+        sys.exit(1)
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    cache = content_model.load_cache()
+    report(process_files(files, cache, jobs))
+    content_model.save_cache(cache)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,175 @@
+"""content_model.py
+
+Shared front-matter/content model for the site generators.
+
+Every `.qmd` is parsed once into its front matter (raw lines and a flat
+`key: value` dict), the offset where the body starts, and derived stats
+(word count). Results are kept in `.cache/content-model.json`, keyed by the
+path relative to the repo root and validated by size+mtime, falling back to
+a content hash when the stat differs. A build where nothing changed does no
+parsing at all, and the body is only read from disk when a caller asks for
+it.
+
+Used by calculate-reading-time.py, generate-projects.py and generate_rss.py:
+
+    import content_model
+
+    cache = content_model.load_cache()
+    doc = content_model.parse(path, cache)
+    doc["front_matter"].get("title"), doc["word_count"]
+    body = content_model.read_body(doc)
+    content_model.save_cache(cache)
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+import tracing
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_FILE = ROOT / ".cache" / "content-model.json"
+
+FRONT_MATTER_RE = re.compile(r'^---\n(.*?)\n---\n', re.DOTALL)
+
+# count_words() patterns, applied in this order
+CODE_BLOCK_RE = re.compile(r'```.*?```', re.DOTALL)
+INLINE_CODE_RE = re.compile(r'`[^`]+`')
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+URL_RE = re.compile(r'https?://[^\s]+')
+LINK_RE = re.compile(r'\[([^\]]+)\]\([^\)]+\)')
+IMAGE_RE = re.compile(r'!\[[^\]]*\]\([^\)]+\)')
+WORD_RE = re.compile(r'\b\w+\b')
+
+
+def _source_hash():
+    # Cached models are only valid for the parser that produced them
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+
+PARSER_VERSION = _source_hash()
+
+
+def count_words(text):
+    """Count words in markdown text, excluding code blocks and front matter."""
+    text = CODE_BLOCK_RE.sub('', text)
+    text = INLINE_CODE_RE.sub('', text)
+    text = HTML_TAG_RE.sub('', text)
+    text = URL_RE.sub('', text)
+    # Markdown links keep their text
+    text = LINK_RE.sub(r'\1', text)
+    text = IMAGE_RE.sub('', text)
+    return sum(1 for _ in WORD_RE.finditer(text))
+
+
+def parse_front_matter(fm_lines):
+    """Flat `key: value` pairs; quotes around values are stripped."""
+    fm = {}
+    for line in fm_lines:
+        if ':' in line:
+            key, value = line.split(':', 1)
+            fm[key.strip()] = value.strip().strip('"\'')
+    return fm
+
+
+def parse_text(text):
+    """Parse .qmd source into a model dict (without path/fingerprint)."""
+    match = FRONT_MATTER_RE.match(text)
+    if not match:
+        return {"fm_lines": [], "front_matter": {}, "body_offset": 0, "word_count": count_words(text)}
+    fm_lines = match.group(1).split('\n')
+    body = text[match.end():]
+    return {
+        "fm_lines": fm_lines,
+        "front_matter": parse_front_matter(fm_lines),
+        "body_offset": match.end(),
+        "word_count": count_words(body),
+    }
+
+
+def load_cache():
+    try:
+        with CACHE_FILE.open("r", encoding="utf-8") as fh:
+            cache = json.load(fh)
+    except (OSError, ValueError):
+        cache = {}
+    if cache.get("parser") != PARSER_VERSION:
+        cache = {"parser": PARSER_VERSION, "files": {}}
+    cache["_dirty"] = False
+    return cache
+
+
+def save_cache(cache):
+    """Persist the cache if anything was parsed; drops deleted files."""
+    if not cache.pop("_dirty", False):
+        return
+    files = {k: v for k, v in cache["files"].items() if (ROOT / k).exists()}
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    # Generators may run concurrently; a per-process temp file keeps the
+    # replace atomic and the loser of a race only costs a cache miss
+    tmp = CACHE_FILE.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({"parser": cache["parser"], "files": files}, sort_keys=True), encoding="utf-8")
+    tmp.replace(CACHE_FILE)
+    cache["_dirty"] = False
+
+
+def cache_key(path):
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(ROOT).as_posix()
+    except ValueError:
+        # Outside the repo (e.g. a one-off file argument): key by absolute path
+        return path.as_posix()
+
+
+def store(path, text, cache):
+    """Parse `text` (just read from or written to `path`) and cache it."""
+    path = Path(path)
+    st = path.stat()
+    with tracing.span("parse", cat="content", path=cache_key(path)):
+        doc = {
+            "path": cache_key(path),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            **parse_text(text),
+        }
+    cache["files"][doc["path"]] = doc
+    cache["_dirty"] = True
+    return doc
+
+
+def remember(doc, cache):
+    """Merge a model produced by another process's cache into `cache`."""
+    if cache["files"].get(doc["path"]) != doc:
+        cache["files"][doc["path"]] = doc
+        cache["_dirty"] = True
+
+
+def parse(path, cache):
+    """Return the model for `path`, parsing only if it changed since cached.
+
+    The model is a dict with keys path, size, mtime_ns, sha256, fm_lines,
+    front_matter, body_offset and word_count.
+    """
+    path = Path(path)
+    key = cache_key(path)
+    doc = cache["files"].get(key)
+    st = path.stat()
+    if doc and doc["size"] == st.st_size and doc["mtime_ns"] == st.st_mtime_ns:
+        return doc
+    text = path.read_text(encoding="utf-8")
+    if doc and doc["sha256"] == hashlib.sha256(text.encode("utf-8")).hexdigest():
+        # Touched (e.g. fresh checkout) but identical: keep the parse
+        doc.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+        cache["_dirty"] = True
+        return doc
+    return store(path, text, cache)
+
+
+def read_body(doc):
+    """Read the markdown body (everything after the front matter) from disk."""
+    text = (ROOT / doc["path"]).read_text(encoding="utf-8")
+    return text[doc["body_offset"]:]
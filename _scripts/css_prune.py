@@ -0,0 +1,286 @@
+"""css_prune.py
+
+Per-page unused-CSS removal and critical-CSS extraction, used by
+bundle_assets.py.
+
+A page is parsed with html.parser into an inventory of the tags, ids,
+classes and attribute names it contains, once for the whole document and
+once for the elements above the fold (the first FOLD_ELEMENTS elements of
+<body>, in document order). A stylesheet is split into rules, and a
+selector is dropped only when it provably cannot match: every compound in
+it (`ul.nav`, `[data-theme="dark"] a`, ...) needs each of its tags, ids,
+classes and attributes to occur somewhere in the inventory. Combinators and
+pseudo-classes are ignored, so this over-keeps but never drops a selector
+that could match.
+
+Classes, ids and attributes that only exist once JavaScript runs are
+covered by treating every word in the string literals of the page's scripts
+(its own files, Quarto's site_libs and inline <script>s) as present (for
+the critical subset, only scripts that run before the fold); a
+literal ending in `-` or `_` counts as a prefix (`'theme-' + name`).
+SAFELIST adds state classes that are built in ways a literal scan misses.
+
+    import css_prune
+
+    page = css_prune.inventory(html, load_script)
+    used, critical = css_prune.prune(css_text, page)
+"""
+
+import re
+from html.parser import HTMLParser
+
+# Elements of <body>, in document order, treated as above the fold. A
+# heuristic, not layout: on this site's pages the first 40 cover the
+# navbar and title block and reach the start of the content (the lead
+# images of a photo page, the TOC of an essay). bundle_assets.py --fold
+# overrides it.
+FOLD_ELEMENTS = 40
+# Toggled by Quarto/Bootstrap through computed names
+SAFELIST = {"active", "show", "showing", "collapsing", "collapsed", "fade", "quarto-dark",
+            "quarto-light", "headroom--pinned", "headroom--unpinned"}
+
+# Grouping at-rules whose contents are rules to prune
+GROUPING_AT_RULES = ("@media", "@supports", "@container", "@layer", "@document")
+# Non-style at-rules that apply globally and are kept in both outputs
+GLOBAL_AT_RULES = ("@font-face", "@property", "@counter-style", "@import", "@charset",
+                   "@namespace", "@layer", "@font-feature-values")
+
+JS_STRING = re.compile(r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`(?:\\.|[^`\\])*`')
+WORD = re.compile(r'[A-Za-z_][\w-]*')
+PSEUDO = re.compile(r'::?[\w-]+')
+COMBINATOR = re.compile(r'\s*[>+~]\s*|\s+')
+SIMPLE = re.compile(r'([#.]?)(-?[A-Za-z_\\][\w\\:-]*|\*)|\[\s*([\w-]+)[^\]]*\]')
+KEYFRAMES = re.compile(r'@(?:-\w+-)?keyframes\s+([\w-]+)')
+
+
+class _Inventory(HTMLParser):
+    def __init__(self, fold):
+        super().__init__(convert_charrefs=True)
+        self.fold = fold
+        self.in_body = False
+        self.count = 0
+        self.in_script = False
+        # [above the fold?, src or None, inline text]
+        self.scripts = []
+        self.page = _empty()
+        self.above = _empty()
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "body":
+            self.in_body = True
+        targets = [self.page]
+        above = not self.in_body or self.count < self.fold
+        if above:
+            targets.append(self.above)
+        if self.in_body:
+            self.count += 1
+        for inv in targets:
+            inv["tags"].add(tag)
+            for name, value in attrs:
+                inv["attrs"].add(name)
+                if name == "id" and value:
+                    inv["ids"].add(value)
+                elif name == "class" and value:
+                    inv["classes"].update(value.split())
+        if tag == "script":
+            self.in_script = True
+            self.scripts.append([above, dict(attrs).get("src"), ""])
+
+    def handle_endtag(self, tag):
+        if tag == "script":
+            self.in_script = False
+
+    def handle_data(self, data):
+        if self.in_script:
+            self.scripts[-1][2] += data
+
+
+def _empty():
+    return {"tags": {"html", "head", "body"}, "ids": set(), "classes": set(), "attrs": set()}
+
+
+def js_words(text):
+    """Every identifier-like word inside a string literal of `text`."""
+    words = set()
+    for literal in JS_STRING.findall(text):
+        words.update(WORD.findall(literal[1:-1]))
+        # 'is-' + state: the literal ends in a separator, so it's a prefix
+        tail = literal[1:-1]
+        if tail[-1:] in ("-", "_") and WORD.fullmatch(tail):
+            words.add(tail + "*")
+    return words
+
+
+def inventory(html, load_script=lambda src: "", fold=FOLD_ELEMENTS):
+    """What a page can contain: {"page": inv, "above": inv}.
+
+    `load_script(src)` returns the source of an external script ("" if it
+    isn't local). Only scripts before the fold count for "above": the rest
+    run after first paint, when the deferred stylesheet covers them.
+    """
+    parser = _Inventory(fold)
+    parser.feed(html)
+    parser.close()
+    words = {"page": set(SAFELIST), "above": set(SAFELIST)}
+    for above, src, text in parser.scripts:
+        found = js_words(load_script(src) if src else text)
+        words["page"] |= found
+        if above:
+            words["above"] |= found
+    inventories = {"page": parser.page, "above": parser.above}
+    for key, inv in inventories.items():
+        inv["words"] = words[key]
+        inv["prefixes"] = tuple(w[:-1] for w in words[key] if w.endswith("*"))
+    return inventories
+
+
+def _has(inv, kind, name):
+    return name in inv[kind] or name in inv["words"] or name.startswith(inv["prefixes"] or ("\0",))
+
+
+def _split_top(text, sep):
+    """Split on `sep` outside (), [] and strings."""
+    parts, depth, quote, start = [], 0, None, 0
+    for i, ch in enumerate(text):
+        if quote:
+            if ch == quote and text[i - 1] != "\\":
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _strip_functional(selector):
+    """Remove :pseudo(...) arguments, which only narrow a match."""
+    out, depth = [], 0
+    for ch in selector:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif depth == 0:
+            out.append(ch)
+    return "".join(out)
+
+
+def may_match(selector, inv):
+    """False only if some compound of `selector` needs something `inv` lacks."""
+    if "&" in selector or "\\" in selector or "|" in selector:
+        return True
+    selector = PSEUDO.sub("", _strip_functional(selector)).strip()
+    for compound in COMBINATOR.split(selector):
+        for m in SIMPLE.finditer(compound):
+            prefix, name, attr = m.groups()
+            if attr:
+                ok = _has(inv, "attrs", attr.lower())
+            elif name == "*":
+                ok = True
+            elif prefix == "#":
+                ok = _has(inv, "ids", name)
+            elif prefix == ".":
+                ok = _has(inv, "classes", name)
+            else:
+                ok = _has(inv, "tags", name.lower())
+            if not ok:
+                return False
+    return True
+
+
+def parse(css):
+    """Minified CSS -> nodes: ("rule", prelude, body), ("group", prelude,
+    children) or ("raw", text)."""
+    nodes, i, n = [], 0, len(css)
+    while i < n:
+        start, depth, quote = i, 0, None
+        # Prelude: up to the first top-level { or ;
+        while i < n:
+            ch = css[i]
+            if quote:
+                if ch == quote and css[i - 1] != "\\":
+                    quote = None
+            elif ch in "\"'":
+                quote = ch
+            elif ch in "([":
+                depth += 1
+            elif ch in ")]":
+                depth -= 1
+            elif depth == 0 and ch in "{;}":
+                break
+            i += 1
+        prelude = css[start:i].strip()
+        if i >= n or css[i] in ";}":
+            if prelude:
+                nodes.append(("raw", prelude + ";"))
+            i += 1
+            continue
+        # Block: up to the matching }
+        body_start, depth, quote = i + 1, 0, None
+        while i < n:
+            ch = css[i]
+            if quote:
+                if ch == quote and css[i - 1] != "\\":
+                    quote = None
+            elif ch in "\"'":
+                quote = ch
+            elif ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+                if depth == 0:
+                    break
+            i += 1
+        body = css[body_start:i]
+        i += 1
+        if prelude.startswith(GROUPING_AT_RULES):
+            nodes.append(("group", prelude, parse(body)))
+        elif prelude.startswith("@") or "{" in body:
+            # @font-face, @keyframes, ..., or nested rules: kept whole
+            nodes.append(("raw", f"{prelude}{{{body}}}"))
+        else:
+            nodes.append(("rule", prelude, body))
+    return nodes
+
+
+def _filter(nodes, inv, critical):
+    out = []
+    for node in nodes:
+        if node[0] == "rule":
+            selectors = _split_top(node[1], ",")
+            keep = [s for s in selectors if may_match(s, inv)]
+            if keep and len(keep) < len(selectors) and any(":-" in s for s in selectors):
+                # A vendor pseudo may be invalid elsewhere and void the whole
+                # list; dropping selectors could revive the rule there
+                keep = selectors
+            if keep:
+                out.append(f"{','.join(keep)}{{{node[2]}}}")
+        elif node[0] == "group":
+            inner = _filter(node[2], inv, critical)
+            if inner:
+                out.append(f"{node[1]}{{{''.join(inner)}}}")
+        elif not critical or node[1].startswith(GLOBAL_AT_RULES):
+            out.append(node[1])
+    return out
+
+
+def prune(css, page):
+    """(used, critical) CSS text for a page from `inventory()`.
+
+    `used` is every rule that may match the page, in the original order.
+    `critical` is the subset that may match above the fold; it is inlined
+    ahead of `used`, which still contains it, so the cascade is unchanged.
+    """
+    nodes = parse(css)
+    used = "".join(_filter(nodes, page["page"], False))
+    critical = "".join(_filter(nodes, page["above"], True))
+    # Animations the critical rules start need their @keyframes
+    frames = [n[1] for n in nodes if n[0] == "raw" and KEYFRAMES.match(n[1])
+              and re.search(rf'\b{re.escape(KEYFRAMES.match(n[1]).group(1))}\b', critical)]
+    return used, critical + "".join(frames)
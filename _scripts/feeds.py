@@ -0,0 +1,266 @@
+"""feeds.py
+
+Streaming feed writers used by generate_rss.py.
+
+One call to write_feeds() emits every configured feed in RSS 2.0, Atom and
+JSON Feed 1.1 at once. Each output is written chunk by chunk (head, one
+chunk per item, tail) to a temporary file that replaces the target when
+complete, so no feed document is ever held in memory as one string. Items
+are visited once, newest first; an item's HTML is produced by the caller's
+`convert` callback right before it is written and shared by every feed and
+format that includes it.
+
+Output is deterministic: channel dates come from the newest item rather
+than the clock, and a file whose new bytes equal the old ones is left
+untouched (same mtime), so unchanged feeds stay byte-identical for
+conditional GETs and CDN caches. Each output's sha256 is returned so the
+caller can publish ETags.
+
+A feed is a dict:
+
+    {"dir": "feeds/projects",            # relative to the output root ("" = root)
+     "title": ..., "description": ...,
+     "home": "https://.../projects/",    # channel link
+     "items": [item, ...]}               # the items this feed carries
+
+and an item a dict with title, date (datetime), url (site-relative),
+description, image (absolute URL or "") and tag.
+"""
+
+import hashlib
+import json
+import os
+import re
+from datetime import UTC, datetime
+from email.utils import format_datetime
+from html import escape
+
+TAG_RE = re.compile(r'<[^>]+>')
+# Build date of a feed when the site has no items at all (fixed, not the
+# clock, so an empty feed stays byte-stable too)
+EMPTY_FEED_DATE = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def escape_cdata(s):
+    return s.replace(']]>', ']]]]><![CDATA[>')
+
+
+def aware(dt):
+    """Naive datetimes (most front-matter dates) are taken as UTC."""
+    return dt if dt.tzinfo else dt.replace(tzinfo=UTC)
+
+
+def with_image(item, content):
+    """Put the featured image at the top of the content, if there is one."""
+    if not item['image']:
+        return content
+    return (f'<p><img src="{escape(item["image"])}" alt="{escape(item["title"])}" '
+            f'style="max-width: 100%; height: auto;" /></p>' + content)
+
+
+# --- RSS 2.0 -----------------------------------------------------------------
+
+def rss_head(feed):
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/" '
+        'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:atom="http://www.w3.org/2005/Atom">\n'
+        '<channel>\n'
+        f'<title>{escape(feed["title"])}</title>\n'
+        f'<link>{feed["home"]}</link>\n'
+        f'<description>{escape(feed["description"])}</description>\n'
+        f'<lastBuildDate>{format_datetime(aware(feed["updated"]))}</lastBuildDate>\n'
+        f'<atom:link href="{feed["self"]}" rel="self" type="application/rss+xml" />\n'
+        '<language>en</language>\n'
+    )
+
+
+def rss_item(feed, item, content):
+    link = feed['site_url'] + item['url']
+    title = escape(item['title'])
+    out = [
+        '<item>',
+        f'<title>{title}</title>',
+        f'<link>{link}</link>',
+        f'<guid isPermaLink="true">{link}</guid>',
+        f'<pubDate>{format_datetime(aware(item["date"]))}</pubDate>',
+    ]
+    if item['tag']:
+        out.append(f'<category>{escape(item["tag"])}</category>')
+    if item['description']:
+        out.append(f'<description><![CDATA[{escape_cdata(item["description"])}]]></description>')
+    else:
+        # Fallback to truncated content
+        plain = TAG_RE.sub('', content)[:200]
+        out.append(f'<description><![CDATA[{escape_cdata(plain)}...]]></description>')
+    out.append('<content:encoded><![CDATA[')
+    out.append(escape_cdata(with_image(item, content)))
+    out.append(']]></content:encoded>')
+    out.append('</item>\n')
+    return '\n'.join(out)
+
+
+def rss_tail(feed):
+    return '</channel>\n</rss>\n'
+
+
+# --- Atom 1.0 ----------------------------------------------------------------
+
+def atom_head(feed):
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom" xml:lang="en">\n'
+        f'<title>{escape(feed["title"])}</title>\n'
+        f'<subtitle>{escape(feed["description"])}</subtitle>\n'
+        f'<id>{feed["home"]}</id>\n'
+        f'<link href="{feed["home"]}" />\n'
+        f'<link href="{feed["self"]}" rel="self" type="application/atom+xml" />\n'
+        f'<updated>{aware(feed["updated"]).isoformat()}</updated>\n'
+        f'<author><name>{escape(feed["author"])}</name></author>\n'
+    )
+
+
+def atom_item(feed, item, content):
+    link = feed['site_url'] + item['url']
+    out = [
+        '<entry>',
+        f'<title>{escape(item["title"])}</title>',
+        f'<id>{link}</id>',
+        f'<link href="{link}" />',
+        f'<updated>{aware(item["date"]).isoformat()}</updated>',
+    ]
+    if item['tag']:
+        out.append(f'<category term="{escape(item["tag"])}" />')
+    if item['description']:
+        out.append(f'<summary>{escape(item["description"])}</summary>')
+    out.append(f'<content type="html">{escape(with_image(item, content), quote=False)}</content>')
+    out.append('</entry>\n')
+    return '\n'.join(out)
+
+
+def atom_tail(feed):
+    return '</feed>\n'
+
+
+# --- JSON Feed 1.1 -----------------------------------------------------------
+
+def json_head(feed):
+    head = json.dumps({
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': feed['title'],
+        'home_page_url': feed['home'],
+        'feed_url': feed['self'],
+        'description': feed['description'],
+        'language': 'en',
+        'authors': [{'name': feed['author']}],
+    }, ensure_ascii=False, indent=1)
+    # Re-open the object so items can be streamed into it
+    return head[:-2] + ',\n "items": [\n'
+
+
+def json_item(feed, item, content):
+    entry = {
+        'id': feed['site_url'] + item['url'],
+        'url': feed['site_url'] + item['url'],
+        'title': item['title'],
+        'content_html': content,
+        'date_published': aware(item['date']).isoformat(),
+    }
+    if item['description']:
+        entry['summary'] = item['description']
+    if item['image']:
+        entry['image'] = item['image']
+    if item['tag']:
+        entry['tags'] = [item['tag']]
+    return '  ' + json.dumps(entry, ensure_ascii=False)
+
+
+def json_tail(feed):
+    return '\n ]\n}\n'
+
+
+FORMATS = {
+    'rss': {'file': 'rss.xml', 'head': rss_head, 'item': rss_item, 'tail': rss_tail, 'separator': ''},
+    'atom': {'file': 'atom.xml', 'head': atom_head, 'item': atom_item, 'tail': atom_tail, 'separator': ''},
+    'json': {'file': 'feed.json', 'head': json_head, 'item': json_item, 'tail': json_tail, 'separator': ',\n'},
+}
+
+
+def emit(output, chunk):
+    data = chunk.encode('utf-8')
+    output['sha256'].update(data)
+    output['fh'].write(data)
+
+
+def same_bytes(path, digest):
+    """True if `path` exists and hashes to `digest`."""
+    h = hashlib.sha256()
+    try:
+        with open(path, 'rb') as fh:
+            for block in iter(lambda: fh.read(1 << 16), b''):
+                h.update(block)
+    except FileNotFoundError:
+        return False
+    return h.hexdigest() == digest
+
+
+def write_feeds(root, site_url, author, feeds, items, convert):
+    """Stream every feed in every format under `root`.
+
+    Args:
+        root: Output root directory
+        site_url: Absolute site URL without trailing slash
+        author: Feed author name
+        feeds: Feed dicts (see module docstring)
+        items: Every item carried by any feed, newest first
+        convert: item -> HTML content; called once per item that is written
+
+    Returns:
+        List of {"path", "sha256", "changed"} dicts, one per output file
+    """
+    outputs = []
+    try:
+        for feed in feeds:
+            members = {id(it) for it in feed['items']}
+            # An empty feed still needs a build date; use the site's newest item
+            newest = [it['date'] for it in (feed['items'] or items[:1])]
+            os.makedirs(os.path.join(root, feed['dir']), exist_ok=True)
+            for fmt in FORMATS.values():
+                path = os.path.join(root, feed['dir'], fmt['file'])
+                channel = dict(feed, site_url=site_url, author=author,
+                               updated=max(newest) if newest else EMPTY_FEED_DATE,
+                               self=f"{site_url}/{os.path.join(feed['dir'], fmt['file'])}")
+                output = {'fmt': fmt, 'path': path, 'fh': open(path + '.tmp', 'wb'),
+                          'sha256': hashlib.sha256(), 'channel': channel,
+                          'members': members, 'written': 0}
+                outputs.append(output)
+                emit(output, fmt['head'](channel))
+
+        for item in items:
+            wanted = [o for o in outputs if id(item) in o['members']]
+            if not wanted:
+                continue
+            content = convert(item)
+            for o in wanted:
+                if o['written']:
+                    emit(o, o['fmt']['separator'])
+                emit(o, o['fmt']['item'](o['channel'], item, content))
+                o['written'] += 1
+
+        for o in outputs:
+            emit(o, o['fmt']['tail'](o['channel']))
+    finally:
+        for o in outputs:
+            o['fh'].close()
+
+    results = []
+    for o in outputs:
+        digest = o['sha256'].hexdigest()
+        changed = not same_bytes(o['path'], digest)
+        if changed:
+            os.replace(o['path'] + '.tmp', o['path'])
+        else:
+            # Keep the old file (and its mtime) when nothing changed
+            os.remove(o['path'] + '.tmp')
+        results.append({'path': o['path'], 'sha256': digest, 'changed': changed})
+    return results
@@ -16,6 +16,8 @@ To add/remove cards, edit _data/bookmarks.yml instead.
 import yaml
 from pathlib import Path
 
+import tracing
+
 def load_bookmarks_data():
     """Load bookmark cards data from YAML file"""
     data_file = Path("_data/bookmarks.yml")
@@ -171,4 +173,5 @@ document.addEventListener('DOMContentLoaded', function() {{
     print(f"  Created {len(bookmarks)} bookmark cards")
 
 if __name__ == "__main__":
-    generate_index_qmd()
+    with tracing.span("generate bookmarks", cat="bookmarks"):
+        generate_index_qmd()
@@ -7,24 +7,69 @@ Clean photos generator: reads `_data/photos.yml` and writes
 The generator computes collection counts from the `images` list, emits
 preview thumbnails (up to three), and places viewer HTML as raw HTML
 fences so Quarto/Pandoc preserves the inner markup.
+
+When generate-thumbnails.py has written its manifest, grid thumbnails and
+the viewer image get `srcset`/`sizes` built from the responsive ladder so
+browsers only fetch the resolution their viewport needs. If WebP/AVIF
+variants exist, grid and preview images are wrapped in `<picture>` with one
+`<source>` per format. Grid thumbnails also get width/height attributes
+and an inline blurred placeholder (the manifest's LQIP data URI) so tiles
+keep their space and show a preview while the lazy image loads.
+
+The viewer itself is the shared `_assets/js/photos-viewer.js` (referenced
+with a content-hash query string), and each collection's image list is
+written to `photos/<slug>/images.json`, which the viewer fetches on first
+open. While a photo is shown the viewer fetches and decodes its neighbours
+in the background; how many on each side is set per collection with an
+optional `prefetch:` key (default 2, 0 disables).
+
+Runs are incremental: each collection's YAML subtree (plus its thumbnail
+manifest entries and this script's own source) is fingerprinted into
+`.cache/photos-pages.json`, untouched collections are not regenerated, and
+pages whose content did not change are not rewritten, so Quarto does not
+re-render them. Pass --force to regenerate every page.
 """
 
+import argparse
+import hashlib
 import json
 import logging
 import sys
 from pathlib import Path
 
+import tracing
+
 try:
     import yaml
 except Exception:
     print("PyYAML is required: pip install pyyaml", file=sys.stderr)
     raise
 
+# libyaml's C loader is several times faster on large photo lists; fall back
+# to the pure-Python loader when PyYAML was built without it.
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
 ROOT = Path(__file__).resolve().parents[1]
 DATA_FILE = ROOT / "_data" / "photos.yml"
 PHOTOS_DIR = ROOT / "photos"
+ASSETS_URL = "/_assets/images/photos"
+THUMBNAIL_MANIFEST = ROOT / "_assets" / "images" / "photos" / ".thumbnails.json"
+FINGERPRINT_FILE = ROOT / ".cache" / "photos-pages.json"
+VIEWER_JS = ROOT / "_assets" / "js" / "photos-viewer.js"
+VIEWER_JS_URL = "/_assets/js/photos-viewer.js"
+
+# Grid cells are 2-up on phones and at most ~340px wide on larger screens
+GRID_SIZES = "(max-width: 639px) 50vw, 340px"
+# Landing-page previews are 96px-high 4:3 boxes
+PREVIEW_SIZES = "128px"
+# Modern codecs offered via <source>, best compression first
+SOURCE_TYPES = ((".avif", "image/avif"), (".webp", "image/webp"))
+# Neighbours decoded ahead of/behind the current viewer photo; capped so a
+# typo in photos.yml can't make the viewer pull a whole collection at once
+DEFAULT_PREFETCH = 2
+MAX_PREFETCH = 8
 
 
 def load_yaml(path: Path):
@@ -32,29 +77,189 @@ def load_yaml(path: Path):
         logging.error("YAML data file not found: %s", path)
         sys.exit(2)
     with path.open("r", encoding="utf-8") as fh:
-        return yaml.safe_load(fh) or {}
+        return yaml.load(fh, Loader=YamlLoader) or {}
+
+
+def build_index(data):
+    """Validate `_data/photos.yml` once and index it by slug and image file.
+
+    Returns {"collections": [entry, ...], "by_slug": {slug: entry}} where each
+    entry is {"slug", "title", "collection" (the raw YAML mapping), "images",
+    "by_file": {file: image}}. Collections missing a slug, title or image
+    list are skipped here, so page generators never re-check them.
+    """
+    index = {"collections": [], "by_slug": {}}
+    for c in data.get("collections", []) or []:
+        slug = c.get("slug")
+        title = c.get("title", "")
+        images = c.get("images") or []
+
+        if not slug or not title or not isinstance(images, list):
+            logging.warning("Skipping collection with missing required fields: %s", slug)
+            continue
+
+        by_file = {}
+        for img in images:
+            # First occurrence wins, matching the old linear scan
+            by_file.setdefault(img.get("file"), img)
+
+        entry = {
+            "slug": slug,
+            "title": title,
+            "collection": c,
+            "images": images,
+            "by_file": by_file,
+        }
+        index["collections"].append(entry)
+        index["by_slug"][slug] = entry
+    return index
+
+
+def load_renditions():
+    """Index generate-thumbnails.py's manifest by slug, then file stem.
+
+    Returns an empty dict when the manifest is missing, in which case pages
+    are generated without srcset exactly as before.
+    """
+    try:
+        with THUMBNAIL_MANIFEST.open("r", encoding="utf-8") as fh:
+            sources = json.load(fh).get("sources", {})
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logging.warning("Ignoring unreadable thumbnail manifest %s: %s", THUMBNAIL_MANIFEST, e)
+        return {}
+
+    renditions = {}
+    for src_key, entry in sources.items():
+        slug, _, name = src_key.partition("/originals/")
+        if not name:
+            continue
+        renditions.setdefault(slug, {})[Path(name).stem] = (src_key, entry)
+    return renditions
+
+
+def srcset_candidates(renditions, slug, filename, include_original=False, ext=".jpg"):
+    """Return [(url, width), ...] narrowest first for one image, or [] if unknown.
+
+    Only renditions with extension `ext` are considered; the original is
+    only offered alongside JPEG renditions.
+    """
+    found = renditions.get(slug, {}).get(Path(filename).stem)
+    if not found:
+        return []
+    src_key, entry = found
+    by_width = {}
+    for out_key, out in sorted(entry.get("outputs", {}).items()):
+        dims = out.get("dims")
+        if dims and out_key.endswith(ext):
+            by_width[dims[0]] = f"{ASSETS_URL}/{out_key}"
+    include_original = include_original and ext == ".jpg"
+    if include_original and entry.get("dims"):
+        # Same width as a rendition -> prefer the untouched original
+        by_width[entry["dims"][0]] = f"{ASSETS_URL}/{src_key}"
+    return sorted(((url, w) for w, url in by_width.items()), key=lambda c: c[1])
+
+
+def placeholder_attrs(renditions, slug, filename):
+    """width/height of the grid thumbnail plus an LQIP background, or ""."""
+    stem = Path(filename).stem
+    found = renditions.get(slug, {}).get(stem)
+    if not found:
+        return ""
+    _, entry = found
+    attrs = ""
+    dims = entry.get("outputs", {}).get(f"{slug}/thumbnails/{stem}.jpg", {}).get("dims")
+    if dims:
+        attrs += f' width="{dims[0]}" height="{dims[1]}"'
+    if entry.get("lqip"):
+        attrs += f' style="background:url({entry["lqip"]}) center/cover no-repeat"'
+    return attrs
+
+
+def format_srcset(candidates):
+    return ", ".join(f"{url} {w}w" for url, w in candidates)
+
+
+def responsive_img(renditions, slug, filename, src, attrs, sizes, indent):
+    """Markup for one thumbnail: a plain <img>, with srcset when the ladder
+    exists, wrapped in <picture> when WebP/AVIF variants exist.
+
+    `attrs` is the attribute string that follows src (alt, loading, ...).
+    """
+    responsive = ""
+    candidates = srcset_candidates(renditions, slug, filename)
+    if len(candidates) > 1:
+        responsive = f' srcset="{format_srcset(candidates)}" sizes="{sizes}"'
+    img = f'<img src="{src}"{responsive}{attrs}>'
+
+    sources = []
+    for ext, mime in SOURCE_TYPES:
+        candidates = srcset_candidates(renditions, slug, filename, ext=ext)
+        if candidates:
+            sources.append(f'{indent}  <source type="{mime}" srcset="{format_srcset(candidates)}" sizes="{sizes}">\n')
+    if not sources:
+        return f'{indent}{img}'
+    return f'{indent}<picture>\n' + "".join(sources) + f'{indent}  {img}\n{indent}</picture>'
 
 
 def ensure_dir(p: Path):
     p.mkdir(parents=True, exist_ok=True)
 
 
-def write_file(path: Path, content: str):
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_file(path: Path, content: str) -> bool:
+    """Write `content` unless the file already holds exactly these bytes.
+
+    Leaving identical files alone keeps their mtime, so Quarto does not
+    re-render them. Returns True if the file was written.
+    """
+    data = content.encode("utf-8")
+    try:
+        if path.read_bytes() == data:
+            logging.info("Unchanged: %s", path)
+            return False
+    except FileNotFoundError:
+        pass
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(content, encoding="utf-8")
+    path.write_bytes(data)
     logging.info("Wrote: %s", path)
+    return True
 
 
-def find_image_meta(images, filename):
-    if not images:
+def load_fingerprints():
+    try:
+        with FINGERPRINT_FILE.open("r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
         return {}
-    for img in images:
-        if img.get("file") == filename:
-            return img
-    return {}
 
 
-def generate_landing_page(collections):
+def save_fingerprints(fingerprints):
+    FINGERPRINT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    FINGERPRINT_FILE.write_text(json.dumps(fingerprints, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def collection_fingerprint(entry, renditions, generator_hash, viewer_version):
+    """Hash everything a collection page is built from.
+
+    That is the collection's YAML subtree, its thumbnail manifest entries
+    (srcset/<picture> markup), the generator itself (markup changes) and the
+    viewer script version baked into the page's <script> URL.
+    """
+    payload = {
+        "collection": entry["collection"],
+        "renditions": renditions.get(entry["slug"], {}),
+        "generator": generator_hash,
+        "viewer": viewer_version,
+    }
+    return content_hash(json.dumps(payload, sort_keys=True, default=str).encode("utf-8"))
+
+
+def generate_landing_page(index, renditions=None):
     front = """---
 title: "Photos"
 page-layout: full
@@ -64,15 +269,14 @@ listing: false
 
 """
 
+    renditions = renditions or {}
     rows = []
-    for c in collections:
-        slug = c.get("slug")
-        title = c.get("title", "")
-        images = c.get("images") or []
-
-        if not slug or not title or not isinstance(images, list):
-            logging.warning("Skipping collection with missing required fields: %s", slug)
-            continue
+    for entry in index["collections"]:
+        c = entry["collection"]
+        slug = entry["slug"]
+        title = entry["title"]
+        images = entry["images"]
+        by_file = entry["by_file"]
 
         date_raw = c.get("date", "")
         count = len(images)
@@ -85,20 +289,23 @@ listing: false
 
         preview_parts = []
         if first_preview:
-            img_meta = find_image_meta(images, first_preview)
+            img_meta = by_file.get(first_preview) or {}
             alt = img_meta.get("alt", "") or ""
             src = f"/_assets/images/photos/{slug}/thumbnails/{first_preview}"
-            preview_parts.append(f'  <div class="thumb-4-3">\n    <img src="{src}" alt="{alt}">\n  </div>')
+            img = responsive_img(renditions, slug, first_preview, src, f' alt="{alt}"', PREVIEW_SIZES, "    ")
+            preview_parts.append(f'  <div class="thumb-4-3">\n{img}\n  </div>')
         if second_preview:
-            img_meta = find_image_meta(images, second_preview)
+            img_meta = by_file.get(second_preview) or {}
             alt = img_meta.get("alt", "") or ""
             src = f"/_assets/images/photos/{slug}/thumbnails/{second_preview}"
-            preview_parts.append(f'  <div class="thumb-4-3 hidden sm:inline-block">\n    <img src="{src}" alt="{alt}">\n  </div>')
+            img = responsive_img(renditions, slug, second_preview, src, f' alt="{alt}"', PREVIEW_SIZES, "    ")
+            preview_parts.append(f'  <div class="thumb-4-3 hidden sm:inline-block">\n{img}\n  </div>')
         if third_preview:
-            img_meta = find_image_meta(images, third_preview)
+            img_meta = by_file.get(third_preview) or {}
             alt = img_meta.get("alt", "") or ""
             src = f"/_assets/images/photos/{slug}/thumbnails/{third_preview}"
-            preview_parts.append(f'  <div class="thumb-4-3 hidden sm:inline-block">\n    <img src="{src}" alt="{alt}">\n  </div>')
+            img = responsive_img(renditions, slug, third_preview, src, f' alt="{alt}"', PREVIEW_SIZES, "    ")
+            preview_parts.append(f'  <div class="thumb-4-3 hidden sm:inline-block">\n{img}\n  </div>')
 
         preview_block = '<div class="preview-thumbnails inline-flex gap-2">\n' + "\n".join(preview_parts) + "\n" + '</div>'
 
@@ -131,23 +338,33 @@ listing: false
     )
 
     content = front + '<link rel="stylesheet" href="/_assets/css/photos.css">\n\n' + '```{=html}\n' + table + '\n```\n'
-    write_file(PHOTOS_DIR / "index.qmd", content)
+    return write_file(PHOTOS_DIR / "index.qmd", content)
 
 
-def generate_collection_page(collection):
-    slug = collection.get("slug")
-    title = collection.get("title", "")
-    images = collection.get("images", [])
+def prefetch_window(collection):
+    """Viewer prefetch radius from the collection's `prefetch:` key."""
+    value = collection.get("prefetch", DEFAULT_PREFETCH)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        logging.warning("Invalid prefetch %r for %s; using %d", value, collection.get("slug"), DEFAULT_PREFETCH)
+        return DEFAULT_PREFETCH
+    return max(0, min(value, MAX_PREFETCH))
 
-    if not slug or not title or not isinstance(images, list):
-        logging.warning("Skipping collection with missing required fields: %s", slug)
-        return
+
+def generate_collection_page(entry, renditions=None, viewer_version=""):
+    collection = entry["collection"]
+    slug = entry["slug"]
+    title = entry["title"]
+    images = entry["images"]
+    renditions = renditions or {}
 
     ensure_dir(PHOTOS_DIR / slug)
     out_path = PHOTOS_DIR / slug / "index.qmd"
 
-    count = len(images) if isinstance(images, list) else 0
+    count = len(images)
     description = collection.get("description", "") or ""
+    prefetch = prefetch_window(collection)
     # month_year is expected like "November 2025"; emit human text and a
     # machine-readable datetime if possible (YYYY-MM). Falls back to raw
     # text if parsing fails.
@@ -213,18 +430,46 @@ def generate_collection_page(collection):
         file = img.get("file", "")
         alt = img.get("alt", "") or ""
         thumb = f"/_assets/images/photos/{slug}/thumbnails/{file}"
+        placeholder = placeholder_attrs(renditions, slug, file)
+        img_html = responsive_img(
+            renditions, slug, file, thumb,
+            f' alt="{alt}"{placeholder} loading="lazy" class="w-full h-auto" /', GRID_SIZES, "      "
+        )
         grid_items.append(
             f'  <a href="#photo-{i}" data-image-index="{i}" class="photo-grid-item">\n'
             f'    <span class="thumb-4-3 inline-block">\n'
-            f'      <img src="{thumb}" alt="{alt}" loading="lazy" class="w-full h-auto" />\n'
+            f'{img_html}\n'
             '    </span>\n'
             '  </a>\n'
         )
 
     grid_html = '<section aria-label="Photo grid" class="photo-grid" id="photo-grid">\n' + "".join(grid_items) + '</section>\n'
 
+    images_json_list = []
+    for img in images:
+        item = {
+            "file": img.get("file", ""),
+            "caption": img.get("caption", "") or "",
+            "alt": img.get("alt", "") or "",
+        }
+        candidates = srcset_candidates(renditions, slug, item["file"], include_original=True)
+        if len(candidates) > 1:
+            # Cap the slot at the original's width so srcset never upscales
+            # beyond what loading the original directly used to show.
+            widest = candidates[-1][1]
+            item["srcset"] = format_srcset(candidates)
+            item["sizes"] = f"(max-width: {widest}px) 98vw, {widest}px"
+        images_json_list.append(item)
+
+    # The image list is fetched by the viewer on first open rather than
+    # inlined, so grid first paint doesn't parse it and it caches separately.
+    images_json = json.dumps(images_json_list, ensure_ascii=False)
+    json_written = write_file(PHOTOS_DIR / slug / "images.json", images_json + "\n")
+    images_version = content_hash(images_json.encode("utf-8"))[:10]
+
     viewer_inner = (
-        '<div class="photo-viewer" id="photo-viewer" style="display:none;">\n'
+        f'<div class="photo-viewer" id="photo-viewer" style="display:none;" data-slug="{slug}" '
+        f'data-images="/photos/{slug}/images.json?v={images_version}" data-count="{count}" data-prefetch="{prefetch}">\n'
         '<div class="viewer-header">\n'
         '<div class="viewer-meta">\n'
         f'<span id="viewer-title">{title}</span> · \n'
@@ -261,61 +506,66 @@ def generate_collection_page(collection):
 
     viewer_html = '```{=html}\n' + viewer_inner + '\n```\n'
 
-    images_json_list = []
-    for img in images:
-        images_json_list.append({
-            "file": img.get("file", ""),
-            "caption": img.get("caption", "") or "",
-            "alt": img.get("alt", "") or "",
-        })
-
-    images_json = json.dumps(images_json_list, ensure_ascii=False)
-
-    js_lines = []
-    js_lines.append('<script>')
-    js_lines.append('(function(){')
-    js_lines.append('  var images = ' + images_json + ';')
-    js_lines.append('  var slug = "' + slug + '";')
-    js_lines.append('  var totalImages = images.length;')
-    js_lines.append('  var currentIndex = 0;')
-    js_lines.append('  var grid = document.getElementById("photo-grid");')
-    js_lines.append('  var viewer = document.getElementById("photo-viewer");')
-    js_lines.append('  var viewerImage = document.getElementById("viewer-image");')
-    js_lines.append('  var captionText = document.getElementById("caption-text");')
-    js_lines.append('  var photoCounter = document.getElementById("photo-counter");')
-    js_lines.append('  function showGrid(){ if(grid) grid.style.display="grid"; if(viewer) { viewer.style.display="none"; viewer.classList.remove("active"); } document.body.style.overflow="auto"; }')
-    js_lines.append('  function showViewer(index){ currentIndex = index; if(grid) grid.style.display="none"; if(!viewer) viewer = document.getElementById("photo-viewer"); if(viewer){ viewer.style.display="flex"; viewer.classList.add("active"); } document.body.style.overflow="hidden"; loadPhoto(index); }')
-    js_lines.append('  function loadPhoto(index){ try{ if(!viewerImage) viewerImage = document.getElementById("viewer-image"); if(!captionText) captionText = document.getElementById("caption-text"); if(!photoCounter) photoCounter = document.getElementById("photo-counter"); var img = images[index]; if(!img) return; var src = "/_assets/images/photos/" + slug + "/originals/" + (img.file||""); if(viewerImage) { viewerImage.src = src; viewerImage.alt = img.alt || ""; } if(captionText) captionText.textContent = img.caption || ""; if(photoCounter) photoCounter.textContent = (index+1) + " / " + totalImages; currentIndex = index; }catch(e){console.error("loadPhoto error",e);} }')
-    js_lines.append('  window.navigatePrev = function(){ var newIndex = currentIndex===0 ? totalImages-1 : currentIndex-1; var hash = "#photo-" + (newIndex+1); history.pushState({index:newIndex}, "", hash); loadPhoto(newIndex); }')
-    js_lines.append('  window.navigateNext = function(){ var newIndex = currentIndex===totalImages-1 ? 0 : currentIndex+1; var hash = "#photo-" + (newIndex+1); history.pushState({index:newIndex}, "", hash); loadPhoto(newIndex); }')
-    js_lines.append('  window.closeViewer = function(){ try{ history.replaceState(null, "", window.location.pathname); showGrid(); }catch(e){} }')
-    js_lines.append('  window.openPhoto = function(evt, num){ try{ if(evt && typeof evt.preventDefault === "function") evt.preventDefault(); var idx = (typeof num === "number") ? num-1 : (parseInt(num,10)-1); if(isNaN(idx)) idx = 0; var hash = "#photo-" + (idx+1); history.pushState({index:idx}, "", hash); showViewer(idx); }catch(e){console.error("openPhoto error",e);} };')
-    js_lines.append('  function handleHash(){ var hash = window.location.hash; if(!hash || hash==="#") { showGrid(); } else { var m = hash.match(/#photo-(\\d+)/); if(m){ var num = parseInt(m[1],10); if(num>=1 && num<=totalImages){ showViewer(num-1); } else { showGrid(); } } } }')
-    js_lines.append('  document.addEventListener("keydown", function(e){ try{ if(viewer && (viewer.classList && viewer.classList.contains("active") || viewer.style.display==="flex")){ if(e.key==="ArrowLeft") navigatePrev(); else if(e.key==="ArrowRight") navigateNext(); else if(e.key==="Escape") closeViewer(); } }catch(e){} });')
-    js_lines.append('  window.addEventListener("hashchange", handleHash);')
-    js_lines.append('  window.addEventListener("popstate", handleHash);')
-    js_lines.append('  handleHash();')
-    js_lines.append('  document.addEventListener("click", function(e){ try{ var a = e.target.closest && e.target.closest("a[data-image-index]"); if(a){ var idx = parseInt(a.getAttribute("data-image-index"),10)-1; if(!isNaN(idx)){ var hash = "#photo-" + (idx+1); history.pushState({index:idx}, "", hash); showViewer(idx); e.preventDefault(); } } }catch(e){} });')
-    js_lines.append('})();')
-    js_lines.append('</script>')
-
-    js = "\n".join(js_lines)
+    js = f'<script src="{VIEWER_JS_URL}?v={viewer_version}" defer></script>\n'
 
     content = front + header_html + grid_html + "\n" + viewer_html + "\n" + js
-    write_file(out_path, content)
+    page_written = write_file(out_path, content)
+    return page_written or json_written
 
 
 def main():
-    data = load_yaml(DATA_FILE)
-    collections = data.get('collections', []) if data else []
+    parser = argparse.ArgumentParser(description="Generate photo pages from _data/photos.yml")
+    parser.add_argument(
+        "--force", "-f",
+        action="store_true",
+        help="Regenerate every collection page, ignoring stored fingerprints"
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="OUT.json",
+        help="Write a Chrome trace of this run (same as SITE_TRACE=OUT.json)"
+    )
+    args = parser.parse_args()
+    tracing.configure(args.trace)
+
+    with tracing.span("load photos.yml", cat="photos"):
+        index = build_index(load_yaml(DATA_FILE))
+    with tracing.span("load renditions", cat="photos"):
+        renditions = load_renditions()
+    generator_hash = content_hash(Path(__file__).read_bytes())
+    # Cache-busting fingerprint for the shared viewer script
+    viewer_version = content_hash(VIEWER_JS.read_bytes())[:10]
+    old_fingerprints = {} if args.force else load_fingerprints()
+    fingerprints = {}
 
     ensure_dir(PHOTOS_DIR)
-    generate_landing_page(collections)
+    with tracing.span("landing page", cat="photos"):
+        written = 1 if generate_landing_page(index, renditions) else 0
+    unchanged = 1 - written
+    untouched = 0
+
+    for entry in index["collections"]:
+        slug = entry["slug"]
+        fingerprint = collection_fingerprint(entry, renditions, generator_hash, viewer_version)
+        fingerprints[slug] = fingerprint
+        outputs = (PHOTOS_DIR / slug / "index.qmd", PHOTOS_DIR / slug / "images.json")
+        if old_fingerprints.get(slug) == fingerprint and all(p.exists() for p in outputs):
+            untouched += 1
+            continue
+        with tracing.span("collection page", cat="photos", slug=slug):
+            changed = generate_collection_page(entry, renditions, viewer_version)
+        if changed:
+            written += 1
+        else:
+            unchanged += 1
 
-    for c in collections:
-        generate_collection_page(c)
+    save_fingerprints(fingerprints)
 
-    logging.info("Generation complete: 1 landing page + %d collection pages", len(collections))
+    tracing.counter("photos pages", written=written, unchanged=unchanged, skipped=untouched)
+    logging.info(
+        "Generation complete: %d pages written, %d unchanged, %d collections skipped (fingerprint match)",
+        written, unchanged, untouched
+    )
 
 
 if __name__ == '__main__':
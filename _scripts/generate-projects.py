@@ -5,11 +5,14 @@ Run this whenever you add/modify projects by running:
 
 python3 generate-projects.py
 
+Front matter is read through the shared content model (content_model.py).
 """
 
-import re
 from pathlib import Path
 
+import content_model
+import tracing
+
 # Define project order (first one is featured)
 PROJECT_ORDER = [
     "rice",
@@ -23,38 +26,13 @@ PROJECT_ORDER = [
     "sentiment",
 ]
 
-def parse_yaml_frontmatter(content):
-    """Simple YAML parser for our specific use case"""
-    if not content.startswith('---'):
-        return {}
-    
-    parts = content.split('---', 2)
-    if len(parts) < 3:
-        return {}
-    
-    frontmatter = parts[1].strip()
-    metadata = {}
-    
-    for line in frontmatter.split('\n'):
-        line = line.strip()
-        if ':' in line:
-            key, value = line.split(':', 1)
-            key = key.strip()
-            value = value.strip().strip('"').strip("'")
-            metadata[key] = value
-    
-    return metadata
-
-def load_project_metadata(project_name):
+def load_project_metadata(project_name, cache):
     """Load metadata from a project's index.qmd file"""
     project_file = Path(f"projects/{project_name}/index.qmd")
     if not project_file.exists():
         return None
     
-    with open(project_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    metadata = parse_yaml_frontmatter(content)
+    metadata = content_model.parse(project_file, cache)["front_matter"]
     
     return {
         'title': metadata.get('title', 'Untitled'),
@@ -74,10 +52,12 @@ def generate_projects_page():
     
     # Load all projects
     projects = []
+    cache = content_model.load_cache()
     for project_name in PROJECT_ORDER:
-        metadata = load_project_metadata(project_name)
+        metadata = load_project_metadata(project_name, cache)
         if metadata:
             projects.append(metadata)
+    content_model.save_cache(cache)
     
     if not projects:
         print("No projects found!")
@@ -197,4 +177,5 @@ def generate_projects_page():
     print(f"   Grid: {len(grid_projects)} projects")
 
 if __name__ == '__main__':
-    generate_projects_page()
+    with tracing.span("generate projects", cat="projects"):
+        generate_projects_page()
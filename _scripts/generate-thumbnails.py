@@ -5,22 +5,43 @@ Auto-generate thumbnails from original photos.
 
 Scans _assets/images/photos/<collection>/originals/ and creates
 corresponding thumbnails in _assets/images/photos/<collection>/thumbnails/
+plus a responsive ladder in _assets/images/photos/<collection>/sizes/<width>/
 
 Features:
 - Configurable thumbnail width (default: 300px)
+- Configurable ladder of larger widths for srcset (default: 800/1600/2400px),
+  all written from a single decode of each original
 - Maintains aspect ratio
-- JPEG output with configurable quality
-- Skips existing thumbnails unless --force is used
+- Fast downscaling: JPEGs are decoded at a reduced DCT scale (draft mode)
+  close to the target size before the final LANCZOS pass (--no-draft to
+  decode at full resolution)
+- JPEG output with configurable quality, plus optional WebP/AVIF variants
+  (--formats jpeg,webp,avif) encoded from the same resized pixels
+- Low-quality image placeholder (LQIP): a ~16px JPEG data URI, taken from
+  the same decode and stored in the manifest with the original's size, so
+  generate-photos.py can reserve layout space and paint a blurred preview
+- Incremental: a manifest records each source's size, mtime and hash plus
+  the width/quality used, so only stale or missing thumbnails are rebuilt
+  (--force still regenerates everything)
+- Optional process pool (--jobs N) spanning all collections at once
 - Handles various image formats (JPEG, PNG, WebP, etc.)
 """
 
 import argparse
+import base64
+import hashlib
+import io
+import json
 import logging
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+import tracing
+
 try:
-    from PIL import Image
+    from PIL import Image, features
 except ImportError:
     print("Pillow is required: pip install Pillow", file=sys.stderr)
     sys.exit(1)
@@ -29,94 +50,407 @@ logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
 ROOT = Path(__file__).resolve().parents[1]
 PHOTOS_DIR = ROOT / "_assets" / "images" / "photos"
+MANIFEST_FILE = PHOTOS_DIR / ".thumbnails.json"
+MANIFEST_VERSION = 2
 
 # Default settings
 DEFAULT_WIDTH = 300
 DEFAULT_QUALITY = 85
+# Responsive ladder written to <collection>/sizes/<width>/ next to thumbnails/
+DEFAULT_WIDTHS = (800, 1600, 2400)
+
+# LQIP: width of the placeholder and its JPEG quality. At 16px the data URI
+# is ~450 bytes, most of it JPEG header that gzip shares across a page.
+LQIP_WIDTH = 16
+LQIP_QUALITY = 40
+
+# Output codecs: extension, Pillow format name, encoder options and an offset
+# applied to --quality. AVIF's quality scale runs "high" compared to JPEG, so
+# q85 AVIF is barely smaller than q85 JPEG; q65 looks comparable at ~40% fewer
+# bytes. JPEG is always written because it is the <img> fallback in pages.
+FORMATS = {
+    "jpeg": {"ext": ".jpg", "pil": "JPEG", "options": {"optimize": True}, "quality_delta": 0},
+    "webp": {"ext": ".webp", "pil": "WEBP", "options": {"method": 6}, "quality_delta": 0},
+    "avif": {"ext": ".avif", "pil": "AVIF", "options": {"speed": 6}, "quality_delta": -20},
+}
+FORMAT_BY_EXT = {spec["ext"]: name for name, spec in FORMATS.items()}
+
+# Supported image extensions
+EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tiff'}
+
+
+def output_quality(dst: Path, quality: int) -> int:
+    """Encoder quality actually used for `dst` (its codec's offset applied)."""
+    return max(1, quality + FORMATS[FORMAT_BY_EXT[dst.suffix]]["quality_delta"])
+
+
+def flatten_to_rgb(img):
+    """Convert to RGB if necessary (for PNG with transparency, etc.)."""
+    if img.mode in ('RGBA', 'P', 'LA'):
+        # Create white background for transparent images
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
+        return background
+    if img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
 
+def make_lqip(img) -> str:
+    """Encode a tiny blurred stand-in for `img` as a data: URI."""
+    height = max(1, round(img.height * LQIP_WIDTH / img.width))
+    tiny = img.resize((LQIP_WIDTH, height), Image.Resampling.BOX)
+    buf = io.BytesIO()
+    tiny.save(buf, "JPEG", quality=LQIP_QUALITY, optimize=True)
+    return "data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
 
-def generate_thumbnail(src: Path, dst: Path, width: int, quality: int) -> bool:
-    """Generate a thumbnail from source image.
+
+def generate_renditions(src: Path, targets: list[tuple[Path, int]], quality: int,
+                        draft: bool = True) -> dict | None:
+    """Decode an original once and write every (dst, width) target from it.
+    
+    Widths are resized widest first, each one downscaled from the next wider
+    rendition, and every codec requested for a width is encoded from that
+    one resized image.
     
     Args:
         src: Path to original image
-        dst: Path to save thumbnail
-        width: Target width in pixels (height auto-calculated)
-        quality: JPEG quality (1-100)
+        targets: (dst, width) pairs; heights keep the aspect ratio and images
+            narrower than a target width are saved at their own size. The
+            codec (JPEG, WebP or AVIF) follows dst's extension.
+        quality: Base encoder quality (1-100); see output_quality()
+        draft: Decode JPEGs at the smallest DCT scale (1/2, 1/4, 1/8) that
+            still covers the widest target, instead of at full resolution
     
     Returns:
-        True if thumbnail was created, False otherwise
+        {"dims": [w, h] of the original, "outputs": {dst: [w, h]},
+        "lqip": data URI}, or None if the original could not be processed
     """
     try:
         with Image.open(src) as img:
-            # Convert to RGB if necessary (for PNG with transparency, etc.)
-            if img.mode in ('RGBA', 'P', 'LA'):
-                # Create white background for transparent images
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-                img = background
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
+            dims = list(img.size)
+            widest = max(width for _, width in targets)
+            if draft and img.format == 'JPEG' and img.width > widest:
+                # Must happen before the pixels are loaded; draft() only ever
+                # picks a scale that keeps the image at least this large.
+                img.draft('RGB', (widest, max(1, img.height * widest // img.width)))
             
-            # Calculate new height maintaining aspect ratio
+            with tracing.span("decode", cat="thumbnails", src=src.name):
+                # Image.open() is lazy: load() is where the pixels are decoded
+                img.load()
+                img = flatten_to_rgb(img)
+            
+            # Calculate new heights maintaining aspect ratio
             orig_width, orig_height = img.size
+            outputs = {}
+            
+            # Widest first, each width downscaled from the previous rendition:
+            # the draft decode has to cover the widest target, so resizing
+            # every width from it would make the thumbnail as costly as 2400px
+            resized = {}
+            source = img
+            for width in sorted({width for _, width in targets}, reverse=True):
+                out = source
+                # Only resize if image is larger than target width
+                if source.width > width:
+                    new_height = max(1, int(orig_height * width / orig_width))
+                    # For formats without draft support, reducing_gap lets Pillow
+                    # shrink by an integer factor with reduce() before LANCZOS.
+                    with tracing.span("resize", cat="thumbnails", src=src.name, width=width):
+                        out = source.resize(
+                            (width, new_height), Image.Resampling.LANCZOS,
+                            reducing_gap=3.0 if draft else None
+                        )
+                resized[width] = out
+                source = out
             
-            # Only resize if image is larger than target width
-            if orig_width > width:
-                ratio = width / orig_width
-                new_height = int(orig_height * ratio)
-                img = img.resize((width, new_height), Image.Resampling.LANCZOS)
+            for dst, width in targets:
+                out = resized[width]
+                spec = FORMATS[FORMAT_BY_EXT[dst.suffix]]
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                with tracing.span("encode", cat="thumbnails", src=src.name, width=width,
+                                  format=spec["pil"]):
+                    out.save(dst, spec["pil"], quality=output_quality(dst, quality), **spec["options"])
+                outputs[dst] = list(out.size)
             
-            # Save as JPEG
-            dst.parent.mkdir(parents=True, exist_ok=True)
-            img.save(dst, 'JPEG', quality=quality, optimize=True)
-            return True
+            # The placeholder comes from the narrowest rendition, which is
+            # already in memory, rather than from another full-size resize
+            lqip = make_lqip(resized[min(resized)])
+            return {"dims": dims, "outputs": outputs, "lqip": lqip}
             
     except Exception as e:
         logging.error("Failed to process %s: %s", src, e)
-        return False
+        return None
 
 
-def process_collection(collection_dir: Path, width: int, quality: int, force: bool) -> tuple[int, int]:
-    """Process all images in a collection's originals folder.
+def generate_thumbnail(src: Path, dst: Path, width: int, quality: int, draft: bool = True) -> bool:
+    """Generate a single thumbnail from source image.
+    
+    Args:
+        src: Path to original image
+        dst: Path to save thumbnail; the codec follows its extension
+        width: Target width in pixels (height auto-calculated)
+        quality: Base encoder quality (1-100); see output_quality()
+        draft: Use reduced-scale JPEG decoding
+    
+    Returns:
+        True if thumbnail was created, False otherwise
+    """
+    return generate_renditions(src, [(dst, width)], quality, draft) is not None
+
+
+def load_manifest() -> dict:
+    """Load the thumbnail manifest, starting fresh if it is missing or unreadable.
+    
+    The manifest maps each original (relative to PHOTOS_DIR) to its source
+    fingerprint and the outputs generated from it:
+    
+        {"version": 2, "sources": {"banaras/originals/photo0013.jpg": {
+            "size": ..., "mtime_ns": ..., "sha256": ..., "dims": [w, h],
+            "lqip": "data:image/jpeg;base64,...",
+            "outputs": {"banaras/thumbnails/photo0013.jpg":
+                        {"width": 300, "quality": 85, "dims": [w, h]},
+                        "banaras/thumbnails/photo0013.webp": {...},
+                        "banaras/sizes/800/photo0013.jpg": {...}}}}}
+    
+    generate-photos.py reads the same file to build srcset attributes,
+    width/height and placeholders.
+    """
+    try:
+        with MANIFEST_FILE.open("r", encoding="utf-8") as fh:
+            manifest = json.load(fh)
+    except FileNotFoundError:
+        return {"version": MANIFEST_VERSION, "sources": {}}
+    except (OSError, ValueError) as e:
+        logging.warning("Ignoring unreadable manifest %s: %s", MANIFEST_FILE, e)
+        return {"version": MANIFEST_VERSION, "sources": {}}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {"version": MANIFEST_VERSION, "sources": {}}
+    manifest.setdefault("sources", {})
+    return manifest
+
+
+def save_manifest(manifest: dict):
+    """Atomically write the manifest next to the collections."""
+    tmp = MANIFEST_FILE.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=1, sort_keys=True)
+        fh.write("\n")
+    tmp.replace(MANIFEST_FILE)
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def source_fingerprint(src: Path, entry: dict | None) -> tuple[dict, bool]:
+    """Fingerprint an original and compare it with its manifest entry.
+    
+    The size+mtime check is a single stat() call, so unchanged sources never
+    get hashed. The hash is only computed when the stat differs (e.g. after a
+    fresh checkout), letting a touched-but-identical file stay fresh.
+    
+    Returns:
+        Tuple of (fingerprint, unchanged)
+    """
+    st = src.stat()
+    fp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if entry and entry.get("size") == fp["size"] and entry.get("mtime_ns") == fp["mtime_ns"]:
+        fp["sha256"] = entry.get("sha256", "")
+        return (fp, True)
+    fp["sha256"] = file_sha256(src)
+    unchanged = bool(entry) and entry.get("size") == fp["size"] and entry.get("sha256") == fp["sha256"]
+    return (fp, unchanged)
+
+
+def expected_outputs(collection_dir: Path, src: Path, dims: list | None, settings: dict) -> dict:
+    """Map each output an original should have to the settings it is built with.
+    
+    The grid thumbnail is always produced; ladder widths are only produced
+    when they are narrower than the original (no upscaling), which needs the
+    original's dimensions from a previous run. Unknown dims -> thumbnail only,
+    the caller will regenerate anyway.
+    """
+    folders = {collection_dir / "thumbnails": settings["width"]}
+    if dims:
+        for width in settings["widths"]:
+            if width < dims[0] and width != settings["width"]:
+                folders[collection_dir / "sizes" / str(width)] = width
+    return {
+        folder / (src.stem + FORMATS[fmt]["ext"]): width
+        for folder, width in folders.items()
+        for fmt in settings["formats"]
+    }
+
+
+def collect_tasks(collection_dir: Path, manifest: dict, settings: dict,
+                  force: bool) -> tuple[list[tuple[Path, dict]], int]:
+    """Find the originals in a collection whose outputs are stale or missing.
+    
+    Also drops manifest entries for originals that no longer exist, deleting
+    their outputs.
     
     Args:
         collection_dir: Path to collection folder (e.g., banaras/)
-        width: Target thumbnail width
-        quality: JPEG quality
+        manifest: Loaded thumbnail manifest (updated in place)
+        settings: Output settings (width, widths, formats, quality, draft)
         force: Regenerate existing thumbnails
     
     Returns:
-        Tuple of (created_count, skipped_count)
+        Tuple of ([(src, fingerprint), ...], skipped_count)
     """
     originals_dir = collection_dir / "originals"
-    thumbnails_dir = collection_dir / "thumbnails"
+    sources = manifest["sources"]
     
     if not originals_dir.exists():
         logging.warning("No originals folder in %s", collection_dir.name)
-        return (0, 0)
+        return ([], 0)
     
-    created = 0
+    tasks = []
     skipped = 0
+    seen = set()
     
-    # Supported image extensions
-    extensions = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tiff'}
-    
-    for src in originals_dir.iterdir():
-        if src.suffix.lower() not in extensions:
+    for src in sorted(originals_dir.iterdir()):
+        if src.suffix.lower() not in EXTENSIONS:
             continue
         
-        # Output as .jpg regardless of input format
-        dst = thumbnails_dir / (src.stem + '.jpg')
+        src_key = src.relative_to(PHOTOS_DIR).as_posix()
+        seen.add(src_key)
         
-        if dst.exists() and not force:
+        entry = sources.get(src_key)
+        fp, unchanged = source_fingerprint(src, entry)
+        fresh = unchanged and "dims" in entry and "lqip" in entry
+        if fresh:
+            recorded = entry.get("outputs", {})
+            expected = expected_outputs(collection_dir, src, entry["dims"], settings)
+            # A changed ladder (added or dropped widths) invalidates the entry
+            fresh = set(recorded) == {dst.relative_to(PHOTOS_DIR).as_posix() for dst in expected}
+        if fresh:
+            for dst, width in expected.items():
+                output = recorded.get(dst.relative_to(PHOTOS_DIR).as_posix(), {})
+                if ((output.get("width"), output.get("quality")) != (width, output_quality(dst, settings["quality"]))
+                        or not dst.exists()):
+                    fresh = False
+                    break
+        
+        if fresh and not force:
+            # Refresh the stored mtime so the next run stays on the stat() path
+            entry.update(fp)
             skipped += 1
             continue
         
-        if generate_thumbnail(src, dst, width, quality):
-            logging.info("Created: %s", dst.relative_to(ROOT))
+        tasks.append((src, fp))
+    
+    prefix = collection_dir.name + "/"
+    for key in [k for k in sources if k.startswith(prefix) and k not in seen]:
+        remove_outputs(sources.pop(key))
+    
+    return (tasks, skipped)
+
+
+def render_source(src: Path, settings: dict) -> dict | None:
+    """Worker entry point: write every output for one original.
+    
+    The ladder depends on the original's width, so the image is probed first
+    (header only, no pixel decode) to decide which targets apply.
+    """
+    collection_dir = src.parent.parent
+    try:
+        with Image.open(src) as probe:
+            dims = list(probe.size)
+    except Exception as e:
+        logging.error("Failed to process %s: %s", src, e)
+        return None
+    targets = expected_outputs(collection_dir, src, dims, settings)
+    with tracing.span("image", cat="thumbnails", src=src.relative_to(PHOTOS_DIR).as_posix()):
+        return generate_renditions(src, list(targets.items()), settings["quality"], settings["draft"])
+
+
+def remove_outputs(entry: dict | None, keep=()) -> int:
+    """Delete the files a manifest entry recorded, except those in `keep`.
+    
+    Args:
+        entry: Manifest entry of one original (None: nothing to do)
+        keep: Output keys (relative to PHOTOS_DIR) that are still expected
+    
+    Returns:
+        Number of files deleted
+    """
+    removed = 0
+    for key in (entry or {}).get("outputs", {}):
+        if key in keep:
+            continue
+        path = PHOTOS_DIR / key
+        if path.exists():
+            path.unlink()
+            logging.info("Removed: %s", path.relative_to(ROOT))
+            removed += 1
+            if path.parent.parent.name == "sizes" and not any(path.parent.iterdir()):
+                # A ladder width that is no longer produced at all
+                path.parent.rmdir()
+    return removed
+
+
+def record_outputs(manifest: dict, src: Path, fp: dict, result: dict, settings: dict):
+    """Store the fingerprint, dimensions and settings of freshly generated outputs.
+    
+    Outputs the previous entry recorded that are no longer produced (a
+    dropped format or ladder width) are deleted, so they are not published.
+    """
+    widths = expected_outputs(src.parent.parent, src, result["dims"], settings)
+    key = src.relative_to(PHOTOS_DIR).as_posix()
+    remove_outputs(manifest["sources"].get(key),
+                   keep={dst.relative_to(PHOTOS_DIR).as_posix() for dst in result["outputs"]})
+    manifest["sources"][key] = {
+        **fp,
+        "dims": result["dims"],
+        "lqip": result["lqip"],
+        "outputs": {
+            dst.relative_to(PHOTOS_DIR).as_posix(): {
+                "width": widths[dst],
+                "quality": output_quality(dst, settings["quality"]),
+                "dims": dims,
+            }
+            for dst, dims in result["outputs"].items()
+        },
+    }
+
+
+def finish_source(manifest: dict, src: Path, fp: dict, result: dict | None, settings: dict) -> bool:
+    """Log and record the outcome of render_source(); returns success."""
+    if result is None:
+        manifest["sources"].pop(src.relative_to(PHOTOS_DIR).as_posix(), None)
+        return False
+    for dst in result["outputs"]:
+        logging.info("Created: %s", dst.relative_to(ROOT))
+    record_outputs(manifest, src, fp, result, settings)
+    return True
+
+
+def process_collection(collection_dir: Path, manifest: dict, settings: dict,
+                       force: bool) -> tuple[int, int]:
+    """Process all images in a collection's originals folder.
+    
+    Args:
+        collection_dir: Path to collection folder (e.g., banaras/)
+        manifest: Loaded thumbnail manifest (updated in place)
+        settings: Output settings (width, widths, formats, quality, draft)
+        force: Regenerate existing thumbnails
+    
+    Returns:
+        Tuple of (created_count, skipped_count), counted per original
+    """
+    tasks, skipped = collect_tasks(collection_dir, manifest, settings, force)
+    created = 0
+    
+    for src, fp in tasks:
+        if finish_source(manifest, src, fp, render_source(src, settings), settings):
             created += 1
         else:
             skipped += 1
@@ -124,6 +458,59 @@ def process_collection(collection_dir: Path, width: int, quality: int, force: bo
     return (created, skipped)
 
 
+def process_parallel(collections: list[Path], manifest: dict, settings: dict,
+                     force: bool, jobs: int) -> tuple[int, int]:
+    """Process every collection at once, fanning originals out to a process pool.
+    
+    Args:
+        collections: Collection folders to process
+        manifest: Loaded thumbnail manifest (updated in place)
+        settings: Output settings (width, widths, formats, quality, draft)
+        force: Regenerate existing thumbnails
+        jobs: Number of worker processes
+    
+    Returns:
+        Tuple of (created_count, skipped_count) summed over all collections
+    """
+    tasks = []
+    skipped = 0
+    for collection_dir in collections:
+        collection_tasks, collection_skipped = collect_tasks(
+            collection_dir, manifest, settings, force
+        )
+        logging.info(
+            "Queued collection: %s (%d to generate, %d up to date)",
+            collection_dir.name, len(collection_tasks), collection_skipped
+        )
+        tasks.extend(collection_tasks)
+        skipped += collection_skipped
+    
+    if not tasks:
+        return (0, skipped)
+    
+    created = 0
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+        futures = {
+            pool.submit(render_source, src, settings): (src, fp)
+            for src, fp in tasks
+        }
+        for future in as_completed(futures):
+            src, fp = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # render_source logs its own failures; this only fires
+                # when the worker itself dies (e.g. killed by the OOM killer).
+                logging.error("Failed to process %s: %s", src, e)
+                result = None
+            if finish_source(manifest, src, fp, result, settings):
+                created += 1
+            else:
+                skipped += 1
+    
+    return (created, skipped)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Generate thumbnails from original photos"
@@ -134,16 +521,30 @@ def main():
         default=DEFAULT_WIDTH,
         help=f"Thumbnail width in pixels (default: {DEFAULT_WIDTH})"
     )
+    parser.add_argument(
+        "--widths",
+        type=str,
+        default=",".join(str(w) for w in DEFAULT_WIDTHS),
+        help="Comma-separated responsive widths written to <collection>/sizes/<width>/; "
+             f"empty to disable (default: {','.join(str(w) for w in DEFAULT_WIDTHS)})"
+    )
+    parser.add_argument(
+        "--formats",
+        type=str,
+        default="jpeg",
+        help="Comma-separated output codecs from: " + ", ".join(FORMATS)
+             + " (default: jpeg; jpeg is always included)"
+    )
     parser.add_argument(
         "--quality", "-q",
         type=int,
         default=DEFAULT_QUALITY,
-        help=f"JPEG quality 1-100 (default: {DEFAULT_QUALITY})"
+        help=f"JPEG/WebP quality 1-100; AVIF uses 20 less (default: {DEFAULT_QUALITY})"
     )
     parser.add_argument(
         "--force", "-f",
         action="store_true",
-        help="Regenerate existing thumbnails"
+        help="Regenerate all thumbnails, even those the manifest says are fresh"
     )
     parser.add_argument(
         "--collection", "-c",
@@ -151,8 +552,27 @@ def main():
         default=None,
         help="Process only this collection (e.g., 'banaras')"
     )
+    parser.add_argument(
+        "--no-draft",
+        dest="draft",
+        action="store_false",
+        help="Decode JPEGs at full resolution before resizing (slower)"
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="Worker processes to use; 0 means one per CPU (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--trace",
+        metavar="OUT.json",
+        help="Write a Chrome trace of this run (same as SITE_TRACE=OUT.json)"
+    )
     
     args = parser.parse_args()
+    tracing.configure(args.trace)
     
     if not PHOTOS_DIR.exists():
         logging.error("Photos directory not found: %s", PHOTOS_DIR)
@@ -172,16 +592,58 @@ def main():
         # Process all collections
         collections = [d for d in PHOTOS_DIR.iterdir() if d.is_dir()]
     
-    for collection_dir in collections:
-        logging.info("Processing collection: %s", collection_dir.name)
-        created, skipped = process_collection(
-            collection_dir, args.width, args.quality, args.force
-        )
-        total_created += created
-        total_skipped += skipped
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    try:
+        widths = sorted({int(w) for w in args.widths.split(",") if w.strip()})
+    except ValueError:
+        logging.error("Invalid --widths value: %s", args.widths)
+        sys.exit(1)
+    formats = ["jpeg"]
+    for fmt in (f.strip().lower() for f in args.formats.split(",")):
+        if not fmt or fmt in formats:
+            continue
+        if fmt not in FORMATS:
+            logging.error("Unknown format in --formats: %s", fmt)
+            sys.exit(1)
+        if not features.check(fmt):
+            logging.warning("Pillow was built without %s support; skipping it", fmt.upper())
+            continue
+        formats.append(fmt)
+    settings = {
+        "width": args.width,
+        "widths": widths,
+        "formats": formats,
+        "quality": args.quality,
+        "draft": args.draft,
+    }
+    manifest = load_manifest()
+    
+    if not args.collection:
+        # Forget collections that have been removed altogether
+        names = {d.name for d in collections}
+        for key in [k for k in manifest["sources"] if k.split("/", 1)[0] not in names]:
+            remove_outputs(manifest["sources"].pop(key))
+    
+    try:
+        if jobs > 1:
+            total_created, total_skipped = process_parallel(
+                collections, manifest, settings, args.force, jobs
+            )
+        else:
+            for collection_dir in collections:
+                logging.info("Processing collection: %s", collection_dir.name)
+                created, skipped = process_collection(
+                    collection_dir, manifest, settings, args.force
+                )
+                total_created += created
+                total_skipped += skipped
+    finally:
+        # Persist progress even if interrupted part-way through a big run
+        save_manifest(manifest)
     
+    tracing.counter("thumbnails", created=total_created, skipped=total_skipped)
     logging.info(
-        "Done: %d thumbnails created, %d skipped",
+        "Done: %d originals processed, %d skipped",
         total_created, total_skipped
     )
 
@@ -4,54 +4,115 @@ Enhanced RSS generator for the site.
 
 Scans `projects/`, `bookmarks/`, `photos/`, and `now/` for `.qmd` files,
 extracts YAML front-matter (title/date/description/image) and content, and writes
-`rss.xml` at the project root (RSS 2.0).
+`rss.xml` (RSS 2.0), `atom.xml` (Atom) and `feed.json` (JSON Feed 1.1) at the
+project root, plus the same three per section under `feeds/<section>/` for
+projects, photos and now. All outputs are streamed by feeds.py from a single
+scan, converting each shipped item once. When run as a Quarto post-render
+hook the feeds are also copied into the rendered output directory.
+
+Output is deterministic: lastBuildDate/updated is the newest item's date,
+ties in date are broken by URL, and unchanged feeds are not rewritten.
+`feed-etags.json` maps each feed path to a strong ETag (its sha256) for the
+deploy step.
 
 Enhanced features:
 - Full HTML content in description with proper formatting
 - Images converted to absolute URLs
-- Better markdown-to-HTML conversion
+- Single-pass markdown-to-HTML conversion (nested lists, tables, Quarto
+  callouts, footnotes, nested emphasis); see bench_markdown.py
 - Support for content:encoded for full article content
 - Proper metadata extraction (author, categories)
+- Front matter and bodies come from the shared content model
+  (content_model.py), so unchanged files are not re-parsed
+- Converted HTML is cached in `.cache/rss.json` by file content hash, so
+  only edited files go through markdown_to_html (the cache is dropped
+  whenever this script changes)
+- Pages without a front-matter date use their first-commit date from
+  git_dates.py (one cached `git log` pass, not a per-file mtime)
+- Two phases: a cheap metadata/date pass picks the newest MAX_ITEMS with a
+  bounded heap, and only those items are converted to HTML
 """
+import argparse
+import hashlib
+import heapq
+import json
 import os
 import re
+import shutil
 import sys
 from datetime import datetime, UTC
-from email.utils import format_datetime
 from html import escape
+from urllib.parse import urljoin
+
+import content_model
+import feeds
+import git_dates
+import tracing
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 SCAN_DIRS = ['projects', 'bookmarks', 'photos', 'now']
-OUT_FILE = os.path.join(ROOT, 'rss.xml')
 SITE_URL = 'https://imsaichauhan.pages.dev'
+MAX_ITEMS = 30
+CHANNEL_TITLE = 'Sai Prakash'
+CHANNEL_DESC = 'Writing on climate, science, and ideas that shape the future'
+AUTHOR = 'Sai Prakash'
+# Sections that also get their own feeds under feeds/<section>/
+SECTION_FEEDS = {'projects': 'Projects', 'photos': 'Photos', 'now': 'Now'}
+ETAG_FILE = os.path.join(ROOT, 'feed-etags.json')
+HTML_CACHE_FILE = os.path.join(ROOT, '.cache', 'rss.json')
 
 
-def read_front_matter(path):
-    """Return dict with title, date (ISO), and the body (markdown)"""
-    with open(path, 'r', encoding='utf-8') as f:
-        text = f.read()
-
-    fm = {}
-    body = text
-    # Look for YAML front-matter at top
-    m = re.match(r'^---\n(.*?)\n---\n(.*)$', text, re.S)
-    if m:
-        fm_block = m.group(1)
-        body = m.group(2)
-        # find simple key: value pairs
-        for line in fm_block.splitlines():
-            line = line.strip()
-            if not line or ':' not in line:
-                continue
-            k, v = line.split(':', 1)
-            k = k.strip()
-            v = v.strip().strip('"\'')
-            fm[k.lower()] = v
+def read_front_matter(path, cache):
+    """Return (content model doc, front matter with lower-cased keys)"""
+    doc = content_model.parse(path, cache)
+    fm = {k.lower(): v for k, v in doc['front_matter'].items()}
+    return doc, fm
+
+
+def converter_fingerprint():
+    # Any edit to this file may change the HTML, so it invalidates the cache
+    with open(__file__, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
 
-    return fm, body
+def load_html_cache():
+    try:
+        with open(HTML_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    if cache.get('converter') != converter_fingerprint():
+        cache = {'converter': converter_fingerprint(), 'entries': {}}
+    return cache
 
 
-def guess_date(fm, path):
+def save_html_cache(cache, used):
+    """Write the cache back, keeping only entries used by this run."""
+    entries = {k: v for k, v in cache['entries'].items() if k in used}
+    os.makedirs(os.path.dirname(HTML_CACHE_FILE), exist_ok=True)
+    tmp = HTML_CACHE_FILE + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'converter': cache['converter'], 'entries': entries}, f, sort_keys=True)
+    os.replace(tmp, HTML_CACHE_FILE)
+
+
+def converted_html(doc, url, html_cache, stats):
+    """markdown_to_html() of the doc's body, from the cache when possible."""
+    # Relative links resolve against the page URL, so it is part of the key
+    key = f"{doc['sha256']} {url}"
+    stats['used'].add(key)
+    entry = html_cache['entries'].get(key)
+    if entry is not None:
+        stats['hits'] += 1
+        return entry['html']
+    stats['misses'] += 1
+    with tracing.span("markdown", cat="rss", path=doc['path']):
+        html = markdown_to_html(content_model.read_body(doc), SITE_URL + url)
+    html_cache['entries'][key] = {'html': html}
+    return html
+
+
+def guess_date(fm, path, dates):
     # front-matter date if available
     date_str = fm.get('date') or fm.get('date-posted') or fm.get('posted')
     if date_str:
@@ -67,9 +128,9 @@ def guess_date(fm, path):
             return datetime.fromisoformat(date_str)
         except Exception:
             pass
-    # fallback to filesystem mtime
-    ts = os.path.getmtime(path)
-    return datetime.fromtimestamp(ts)
+    # fallback to the first commit (mtime if untracked), as naive UTC like
+    # the front-matter dates it is compared with
+    return git_dates.created(path, dates).astimezone(UTC).replace(tzinfo=None)
 
 
 def make_url(path):
@@ -84,173 +145,524 @@ def make_url(path):
     return url
 
 
-def escape_cdata(s):
-    return s.replace(']]>', ']]]]><![CDATA[>')
-
-
-def markdown_to_html(text):
-    """Convert markdown to HTML with proper formatting."""
-    # Remove Quarto div syntax
-    text = re.sub(r':::\s*\{[^}]+\}\s*', '', text)
-    text = re.sub(r'^:::$', '', text, flags=re.MULTILINE)
-    # Remove HTML blocks
-    text = re.sub(r'```\{=html\}.*?```', '', text, flags=re.DOTALL)
-    # Remove code blocks but preserve their content as <pre><code>
-    def code_replacer(match):
-        code = match.group(1) if match.group(1) else match.group(0)
-        return f'<pre><code>{escape(code)}</code></pre>'
-    text = re.sub(r'```(?:[a-z]+)?\n(.*?)```', code_replacer, text, flags=re.DOTALL)
-    
-    # Convert headings
-    text = re.sub(r'^### (.+)$', r'<h3>\1</h3>', text, flags=re.MULTILINE)
-    text = re.sub(r'^## (.+)$', r'<h2>\1</h2>', text, flags=re.MULTILINE)
-    text = re.sub(r'^# (.+)$', r'<h1>\1</h1>', text, flags=re.MULTILINE)
-    
-    # Convert bold and italic
-    text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
-    text = re.sub(r'\*(.+?)\*', r'<em>\1</em>', text)
-    
-    # Convert links
-    text = re.sub(r'\[([^\]]+)\]\(([^\)]+)\)', r'<a href="\2">\1</a>', text)
-    
-    # Convert images to absolute URLs
-    text = re.sub(r'!\[([^\]]*)\]\((/[^\)]+)\)', rf'<img src="{SITE_URL}\2" alt="\1" />', text)
-    text = re.sub(r'!\[([^\]]*)\]\((\.\./[^\)]+)\)', lambda m: f'<img src="{SITE_URL}/{m.group(2).replace("../", "")}" alt="{m.group(1)}" />', text)
-    
-    # Convert paragraphs
-    lines = text.split('\n')
-    html_lines = []
-    in_paragraph = False
-    for line in lines:
-        line = line.strip()
-        if not line:
-            if in_paragraph:
-                html_lines.append('</p>')
-                in_paragraph = False
-        elif line.startswith('<h') or line.startswith('<pre>') or line.startswith('<img'):
-            if in_paragraph:
-                html_lines.append('</p>')
-                in_paragraph = False
-            html_lines.append(line)
+# --- Markdown -> HTML -------------------------------------------------------
+# A single pass over the lines splits the body into blocks; each block's text
+# is then scanned once by INLINE_RE. All patterns are compiled up front.
+
+# Classifies a line in one match; lines that match nothing are paragraph text
+BLOCK_RE = re.compile(r'''
+    (?P<blank>\s*$)
+  | (?P<fence>\s{0,3}(?:`{3}|~{3}))
+  | (?P<comment>\s*<!--)
+  | (?P<div>\s{0,3}:{3})
+  | (?P<heading>\s{0,3}\#{1,6}\s)
+  | (?P<hr>\s{0,3}(?P<hr_char>[-*_])(?:\s*(?P=hr_char)){2,}\s*$)
+  | (?P<quote>\s{0,3}>)
+  | (?P<list>\s*(?:[-*+]|\d{1,9}[.)])(?:\s|$))
+  | (?P<table>\s*\|)
+  | (?P<footnote>\[\^[^\]]+\]:)
+  | (?P<skip_html>\s{0,3}<(?:script|style|link|meta|noscript)\b)
+  | (?P<html>\s{0,3}</?(?:address|article|aside|blockquote|details|div|dl|figure|footer|form|h[1-6]|header|hr|iframe|ol|p|pre|section|table|ul|video)\b)
+''', re.X | re.I)
+# A line starting with anything else is plain text; skipping BLOCK_RE for
+# those keeps long paragraphs cheap
+BLOCK_START = frozenset(' \t`~<:#-*_>+|[0123456789')
+# Kinds that end a paragraph (lists are checked separately, see _interrupts)
+INTERRUPTS = frozenset(('blank', 'fence', 'div', 'heading', 'hr', 'quote', 'footnote'))
+
+FENCE_RE = re.compile(r'^\s{0,3}(`{3,}|~{3,})\s*([^`]*?)\s*$')
+DIV_RE = re.compile(r'^\s{0,3}(:{3,})\s*(.*?)\s*$')
+HEADING_RE = re.compile(r'^\s{0,3}(#{1,6})\s+(.*?)(?:\s+#+)?\s*(?:\{[^}]*\})?\s*$')
+QUOTE_RE = re.compile(r'^\s{0,3}>\s?')
+LIST_RE = re.compile(r'^(\s*)([-*+]|\d{1,9}[.)])(\s+|$)')
+TABLE_SEP_RE = re.compile(r'^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$')
+FOOTNOTE_DEF_RE = re.compile(r'^\[\^([^\]]+)\]:\s*(.*)$')
+CLASS_RE = re.compile(r'\.([\w-]+)')
+TITLE_ATTR_RE = re.compile(r'title="([^"]*)"')
+
+INLINE_RE = re.compile(r'''
+    (?P<text>[^`$!\[\]<>*_\\&{]+)
+  | (?P<code>`+)(?P<code_text>.+?)(?P=code)
+  | (?P<math>\$(?=\S)[^$]*?(?<=\S)\$(?!\d))
+  | !\[(?P<img_alt>[^\]]*)\]\((?P<img_src>[^)\s]+)(?:\s+"[^"]*")?\)(?:\{[^}]*\})?
+  | \[\^(?P<fn>[^\]]+)\]
+  | \[(?P<link_text>(?:[^\[\]]|\[[^\]]*\])+)\]\((?P<link_href>[^)\s]*)(?:\s+"[^"]*")?\)(?:\{[^}]*\})?
+  | \[(?P<span_text>[^\]]+)\]\{[^}]*\}
+  | <(?P<autolink>https?://[^>\s]+)>
+  | (?P<html></?[A-Za-z][\w-]*(?:\s[^<>]*)?/?>|<!--.*?-->)
+  | (?P<entity>&(?:\#\d+|\#x[0-9a-fA-F]+|\w+);)
+  | (?P<delim>\*\*|__|\*|_)
+  | \\(?P<escaped>[\\`*_{}\[\]()#+\-.!$|<>])
+  | (?P<other>.)
+''', re.X | re.S)
+
+# Any character INLINE_RE treats specially; text without one is escaped as is
+INLINE_SPECIAL_RE = re.compile(r'[`$!\[\]<>*_\\&{]')
+
+CALLOUT_TITLES = {'note': 'Note', 'tip': 'Tip', 'warning': 'Warning',
+                  'caution': 'Caution', 'important': 'Important'}
+
+
+def _text(s):
+    """escape(s, quote=False), skipping the replaces for the common clean case."""
+    if '&' in s or '<' in s or '>' in s:
+        return s.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    return s
+
+
+def _absolute(base_url, url):
+    """Resolve a link/image URL against the page; absolute URLs skip urljoin."""
+    if url.startswith(('https://', 'http://', 'mailto:')):
+        return url
+    return urljoin(base_url, url)
+
+
+def _inline(text, base_url):
+    """Convert one block's inline markdown in a single INLINE_RE scan."""
+    if not INLINE_SPECIAL_RE.search(text):
+        return text
+    out = []
+    openers = []  # [(delimiter, index into out)] of unmatched * / ** / _ / __
+    for m in INLINE_RE.finditer(text):
+        kind = m.lastgroup
+        if kind == 'text':
+            out.append(m.group(0))
+        elif kind == 'code_text':
+            out.append(f'<code>{_text(m.group("code_text").strip())}</code>')
+        elif kind == 'math':
+            out.append(_text(m.group(0)))
+        elif kind == 'img_src':
+            src = _absolute(base_url, m.group('img_src'))
+            out.append(f'<img src="{escape(src)}" alt="{escape(m.group("img_alt"))}" />')
+        elif kind == 'fn':
+            out.append(f'<sup>{escape(m.group("fn"))}</sup>')
+        elif kind == 'link_href':
+            href = _absolute(base_url, m.group('link_href'))
+            out.append(f'<a href="{escape(href)}">{_inline(m.group("link_text"), base_url)}</a>')
+        elif kind == 'span_text':
+            out.append(_inline(m.group('span_text'), base_url))
+        elif kind == 'autolink':
+            url = escape(m.group('autolink'))
+            out.append(f'<a href="{url}">{url}</a>')
+        elif kind in ('html', 'entity'):
+            out.append(m.group(0))
+        elif kind == 'escaped':
+            out.append(_text(m.group('escaped')))
+        elif kind == 'delim':
+            delim = m.group(0)
+            before = text[m.start() - 1] if m.start() else ' '
+            after = text[m.end()] if m.end() < len(text) else ' '
+            if delim[0] == '_' and before.isalnum() and after.isalnum():
+                # snake_case words are not emphasis
+                out.append(delim)
+                continue
+            closing = None
+            if not before.isspace():
+                for k in range(len(openers) - 1, -1, -1):
+                    if openers[k][0] == delim:
+                        closing = k
+                        break
+            if closing is not None:
+                tag = 'strong' if len(delim) == 2 else 'em'
+                out[openers[closing][1]] = f'<{tag}>'
+                # Openers inside the closed span stay literal
+                del openers[closing:]
+                out.append(f'</{tag}>')
+            elif not after.isspace():
+                openers.append((delim, len(out)))
+                out.append(delim)
+            else:
+                out.append(delim)
         else:
-            if not in_paragraph:
-                html_lines.append('<p>')
-                in_paragraph = True
+            out.append(_text(m.group(0)))
+    return ''.join(out)
+
+
+def _table(rows, base_url):
+    def cells(row):
+        row = row.strip()
+        if row.startswith('|'):
+            row = row[1:]
+        if row.endswith('|'):
+            row = row[:-1]
+        return [c.strip() for c in row.split('|')]
+
+    aligns = []
+    for spec in cells(rows[1]):
+        if spec.startswith(':') and spec.endswith(':'):
+            aligns.append(' style="text-align:center"')
+        elif spec.endswith(':'):
+            aligns.append(' style="text-align:right"')
+        else:
+            aligns.append('')
+
+    def render(row, tag):
+        parts = cells(row)
+        return '<tr>' + ''.join(
+            f'<{tag}{aligns[i] if i < len(aligns) else ""}>{_inline(c, base_url)}</{tag}>'
+            for i, c in enumerate(parts)
+        ) + '</tr>'
+
+    body = ''.join(render(r, 'td') for r in rows[2:])
+    return f'<table><thead>{render(rows[0], "th")}</thead><tbody>{body}</tbody></table>'
+
+
+def _interrupts(line):
+    """True if `line` ends the paragraph (or lazy list line) before it."""
+    if line and line[0] not in BLOCK_START:
+        return False
+    m = BLOCK_RE.match(line)
+    if not m:
+        return False
+    if m.lastgroup != 'list':
+        return m.lastgroup in INTERRUPTS
+    marker = LIST_RE.match(line).group(2)
+    # Only bullets and lists starting at 1 interrupt a paragraph, so a line
+    # like "2050. The United States ..." stays part of it
+    return not marker[0].isdigit() or marker[:-1] == '1'
+
+
+def _indent(line):
+    return len(line) - len(line.lstrip(' '))
+
+
+def _list(lines, i, base_url, footnotes):
+    """Parse the list starting at lines[i]; returns (html, next index)."""
+    first = LIST_RE.match(lines[i])
+    indent = len(first.group(1))
+    ordered = first.group(2)[0].isdigit()
+    items = []
+    loose = False
+    n = len(lines)
+    while i < n:
+        line = lines[i]
+        m = LIST_RE.match(line)
+        if m and len(m.group(1)) <= indent + 1 and m.group(2)[0].isdigit() == ordered:
+            content_indent = m.end(0) if m.group(3) else m.end(2) + 1
+            items.append({'indent': content_indent, 'lines': [line[m.end(0):]]})
+            i += 1
+            continue
+        if not line.strip():
+            j = i + 1
+            while j < n and not lines[j].strip():
+                j += 1
+            nxt = LIST_RE.match(lines[j]) if j < n else None
+            same_list = nxt and len(nxt.group(1)) <= indent + 1 and nxt.group(2)[0].isdigit() == ordered
+            if j < n and (_indent(lines[j]) > indent or same_list):
+                loose = True
+                items[-1]['lines'].append('')
+                i += 1
+                continue
+            break
+        item = items[-1]
+        if _indent(line) > indent:
+            item['lines'].append(line[min(item['indent'], _indent(line)):])
+        elif item['lines'][-1].strip() and not _interrupts(line):
+            # Lazy continuation line (not indented)
+            item['lines'].append(line.strip())
+        else:
+            break
+        i += 1
+
+    parts = []
+    for item in items:
+        blocks = _blocks(item['lines'], base_url, footnotes)
+        if not loose and blocks and blocks[0].startswith('<p>'):
+            blocks[0] = blocks[0][3:-4]
+        parts.append('<li>' + ''.join(blocks) + '</li>')
+    tag = 'ol' if ordered else 'ul'
+    start = first.group(2)[:-1] if ordered else '1'
+    attrs = f' start="{int(start)}"' if start != '1' and int(start) != 1 else ''
+    return f'<{tag}{attrs}>' + ''.join(parts) + f'</{tag}>', i
+
+
+def _blocks(lines, base_url, footnotes):
+    """Convert a list of lines into a list of HTML block strings."""
+    out = []
+    i = 0
+    n = len(lines)
+    while i < n:
+        line = lines[i]
+        b = BLOCK_RE.match(line) if not line or line[0] in BLOCK_START else None
+        kind = b.lastgroup if b else None
+
+        if kind == 'blank':
+            i += 1
+            continue
+
+        if kind == 'fence':
+            m = FENCE_RE.match(line)
+            if m:
+                fence, info = m.group(1), m.group(2)
+                j = i + 1
+                while j < n and not (lines[j].strip().startswith(fence) and not lines[j].strip().strip(fence[0])):
+                    j += 1
+                # Raw {=html}/{=latex} blocks are page widgets, not article content
+                if not info.startswith('{='):
+                    lang = info.strip('{}').split()[0].lstrip('.') if info.strip('{}') else ''
+                    cls = f' class="language-{escape(lang)}"' if lang else ''
+                    code = '\n'.join(lines[i + 1:j])
+                    out.append(f'<pre><code{cls}>{escape(code, quote=False)}</code></pre>')
+                i = j + 1
+                continue
+
+        elif kind == 'comment':
+            while i < n and '-->' not in lines[i]:
+                i += 1
+            i += 1
+            continue
+
+        elif kind == 'div':
+            attrs = DIV_RE.match(line).group(2)
+            if not attrs:
+                # Stray closing fence
+                i += 1
+                continue
+            depth = 1
+            j = i + 1
+            while j < n:
+                d = DIV_RE.match(lines[j])
+                if d:
+                    depth += 1 if d.group(2) else -1
+                    if depth == 0:
+                        break
+                j += 1
+            inner = lines[i + 1:j]
+            callout = next((c for c in CLASS_RE.findall(attrs) if c.startswith('callout-')), None)
+            if callout:
+                out.append(_callout(callout[len('callout-'):], attrs, inner, base_url, footnotes))
             else:
-                html_lines.append(' ')
-            html_lines.append(line)
-    if in_paragraph:
-        html_lines.append('</p>')
-    
-    text = ''.join(html_lines)
-    # Clean up excessive whitespace
-    text = re.sub(r'\n\n\n+', '\n\n', text)
-    return text.strip()
+                out.extend(_blocks(inner, base_url, footnotes))
+            i = j + 1
+            continue
+
+        elif kind == 'heading':
+            m = HEADING_RE.match(line)
+            level = len(m.group(1))
+            out.append(f'<h{level}>{_inline(m.group(2), base_url)}</h{level}>')
+            i += 1
+            continue
+
+        elif kind == 'hr':
+            out.append('<hr />')
+            i += 1
+            continue
+
+        elif kind == 'quote':
+            quoted = []
+            while i < n and lines[i].strip():
+                quoted.append(QUOTE_RE.sub('', lines[i], count=1))
+                i += 1
+            out.append('<blockquote>' + ''.join(_blocks(quoted, base_url, footnotes)) + '</blockquote>')
+            continue
+
+        elif kind == 'list':
+            html, i = _list(lines, i, base_url, footnotes)
+            out.append(html)
+            continue
+
+        elif kind == 'table':
+            if i + 1 < n and TABLE_SEP_RE.match(lines[i + 1]):
+                j = i + 2
+                while j < n and lines[j].strip().startswith('|'):
+                    j += 1
+                out.append(_table(lines[i:j], base_url))
+                i = j
+                continue
+
+        elif kind == 'footnote':
+            m = FOOTNOTE_DEF_RE.match(line)
+            text = [m.group(2)]
+            i += 1
+            while i < n and lines[i].strip() and (_indent(lines[i]) or not _interrupts(lines[i])):
+                text.append(lines[i].strip())
+                i += 1
+            footnotes.append((m.group(1), _inline(' '.join(text), base_url)))
+            continue
+
+        elif kind == 'skip_html':
+            # Page assets (stylesheets, scripts) mean nothing in a feed
+            while i < n and lines[i].strip():
+                i += 1
+            continue
+
+        elif kind == 'html':
+            j = i
+            while j < n and lines[j].strip():
+                j += 1
+            out.append('\n'.join(lines[i:j]))
+            i = j
+            continue
+
+        para = [line.strip()]
+        i += 1
+        while i < n:
+            line = lines[i]
+            # Inline the BLOCK_START test: most paragraph lines start with a letter
+            if (not line or line[0] in BLOCK_START) and _interrupts(line):
+                break
+            para.append(line.strip())
+            i += 1
+        out.append(f'<p>{_inline(" ".join(para), base_url)}</p>')
+    return out
+
+
+def _callout(kind, attrs, inner, base_url, footnotes):
+    """A Quarto callout as a titled blockquote (feed readers lack the CSS)."""
+    t = TITLE_ATTR_RE.search(attrs)
+    title = t.group(1) if t else None
+    k = 0
+    while k < len(inner) and not inner[k].strip():
+        k += 1
+    h = HEADING_RE.match(inner[k]) if k < len(inner) else None
+    if title is None and h:
+        title = h.group(2)
+        inner = inner[k + 1:]
+    title = title or CALLOUT_TITLES.get(kind, kind.capitalize())
+    body = ''.join(_blocks(inner, base_url, footnotes))
+    return (f'<blockquote class="callout callout-{escape(kind)}">'
+            f'<p><strong>{_inline(title, base_url)}</strong></p>{body}</blockquote>')
+
+
+def markdown_to_html(text, base_url=SITE_URL + '/'):
+    """Convert a page's markdown body to HTML for feed readers.
+
+    Handles headings, paragraphs, nested bullet/ordered lists, blockquotes,
+    pipe tables, fenced code, Quarto callouts and fenced divs (unwrapped),
+    footnotes, and nested emphasis/links/images. Relative link and image
+    URLs are resolved against `base_url` (the page's absolute URL). Raw
+    `{=html}` blocks and HTML comments are dropped.
+    """
+    footnotes = []
+    blocks = _blocks(text.split('\n'), base_url, footnotes)
+    if footnotes:
+        items = ''.join(f'<li>{html}</li>' for _, html in footnotes)
+        blocks.append(f'<hr /><ol class="footnotes">{items}</ol>')
+    return '\n'.join(blocks)
+
+
+def feed_order(item):
+    """Sort key for newest-first selection; the URL makes date ties stable."""
+    return (item['date'], item['url'])
+
+
+def write_etags(results):
+    """Write feed-etags.json ({"rss.xml": "\"<sha256>\"", ...}) if it changed."""
+    etags = {
+        os.path.relpath(r['path'], ROOT).replace(os.sep, '/'): f'"{r["sha256"]}"'
+        for r in results
+    }
+    data = json.dumps(etags, indent=1, sort_keys=True) + '\n'
+    try:
+        with open(ETAG_FILE, 'r', encoding='utf-8') as f:
+            if f.read() == data:
+                return
+    except FileNotFoundError:
+        pass
+    with open(ETAG_FILE, 'w', encoding='utf-8') as f:
+        f.write(data)
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Write the site's RSS, Atom and JSON feeds")
+    parser.add_argument('--trace', metavar='OUT.json',
+                        help='Write a Chrome trace of this run (same as SITE_TRACE=OUT.json)')
+    args = parser.parse_args()
+    tracing.configure(args.trace)
+
     items = []
-    for d in SCAN_DIRS:
-        dirpath = os.path.join(ROOT, d)
-        if not os.path.isdir(dirpath):
-            continue
-        for root_dir, _, files in os.walk(dirpath):
-            for fn in files:
-                if not fn.endswith('.qmd'):
-                    continue
-                path = os.path.join(root_dir, fn)
-                fm, body = read_front_matter(path)
-                # Use pagetitle if title is empty, then fallback to filename
-                title = fm.get('title') or fm.get('pagetitle') or fm.get('name') or os.path.splitext(fn)[0]
-                dt = guess_date(fm, path)
-                url = make_url(path)
-                description = fm.get('description', '')
-                image = fm.get('image', '')
-                tag = fm.get('tag', '')
+    cache = content_model.load_cache()
+    with tracing.span("git dates", cat="rss"):
+        dates = git_dates.load()
+    html_cache = load_html_cache()
+    stats = {'hits': 0, 'misses': 0, 'used': set()}
+    with tracing.span("scan", cat="rss"):
+        for d in SCAN_DIRS:
+            dirpath = os.path.join(ROOT, d)
+            if not os.path.isdir(dirpath):
+                continue
+            for root_dir, dirs, files in os.walk(dirpath):
+                dirs.sort()
+                for fn in sorted(files):
+                    if not fn.endswith('.qmd'):
+                        continue
+                    path = os.path.join(root_dir, fn)
+                    doc, fm = read_front_matter(path, cache)
+                    # Use pagetitle if title is empty, then fallback to filename
+                    title = fm.get('title') or fm.get('pagetitle') or fm.get('name') or os.path.splitext(fn)[0]
+                    dt = guess_date(fm, path, dates)
+                    url = make_url(path)
+                    description = fm.get('description', '')
+                    image = fm.get('image', '')
+                    tag = fm.get('tag', '')
                 
-                # Convert relative image paths to absolute URLs
-                if image and image.startswith('../'):
-                    image = SITE_URL + '/' + image.replace('../', '')
-                elif image and not image.startswith('http'):
-                    image = SITE_URL + image
+                    # Convert relative image paths to absolute URLs
+                    if image and image.startswith('../'):
+                        image = SITE_URL + '/' + image.replace('../', '')
+                    elif image and not image.startswith('http'):
+                        image = SITE_URL + image
                 
-                content_html = markdown_to_html(body)
-                items.append({
-                    'title': title,
-                    'date': dt,
-                    'url': url,
-                    'description': description,
-                    'content': content_html,
-                    'image': image,
-                    'tag': tag
-                })
-
-    # sort descending by date
-    items.sort(key=lambda x: x['date'], reverse=True)
-    # limit to recent 30
-    items = items[:30]
-
-    channel_title = 'Sai Prakash'
-    channel_link = SITE_URL
-    channel_desc = 'Writing on climate, science, and ideas that shape the future'
+                    items.append({
+                        'doc': doc,
+                        'section': d,
+                        'title': title,
+                        'date': dt,
+                        'url': url,
+                        'description': description,
+                        'image': image,
+                        'tag': tag
+                    })
 
-    parts = []
-    parts.append('<?xml version="1.0" encoding="utf-8"?>')
-    parts.append('<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/" xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:atom="http://www.w3.org/2005/Atom">')
-    parts.append('<channel>')
-    parts.append(f'<title>{channel_title}</title>')
-    parts.append(f'<link>{channel_link}</link>')
-    parts.append(f'<description>{channel_desc}</description>')
-    parts.append(f'<lastBuildDate>{format_datetime(datetime.now(UTC))}</lastBuildDate>')
-    parts.append(f'<atom:link href="{SITE_URL}/rss.xml" rel="self" type="application/rss+xml" />')
-    parts.append(f'<language>en</language>')
-
-    for it in items:
-        pub = format_datetime(it['date'])
-        title = escape(it['title'])
-        link = SITE_URL + it['url']
-        guid = link
-        description = it.get('description', '')
-        content = escape_cdata(it['content'])
-        image = it.get('image', '')
-        tag = it.get('tag', '')
-        
-        parts.append('<item>')
-        parts.append(f'<title>{title}</title>')
-        parts.append(f'<link>{link}</link>')
-        parts.append(f'<guid isPermaLink="true">{guid}</guid>')
-        parts.append(f'<pubDate>{pub}</pubDate>')
-        
-        # Add category/tag if available
-        if tag:
-            parts.append(f'<category>{escape(tag)}</category>')
-        
-        # Short description in description field
-        if description:
-            parts.append(f'<description><![CDATA[{escape_cdata(description)}]]></description>')
-        else:
-            # Fallback to truncated content
-            plain_content = re.sub(r'<[^>]+>', '', content)[:200]
-            parts.append(f'<description><![CDATA[{escape_cdata(plain_content)}...]]></description>')
-        
-        # Full HTML content in content:encoded
-        full_content = content
-        # Add featured image at the top of content if available
-        if image:
-            full_content = f'<p><img src="{escape(image)}" alt="{escape(title)}" style="max-width: 100%; height: auto;" /></p>' + full_content
-        
-        parts.append('<content:encoded><![CDATA[')
-        parts.append(full_content)
-        parts.append(']]></content:encoded>')
-        parts.append('</item>')
-
-    parts.append('</channel>')
-    parts.append('</rss>')
-
-    with open(OUT_FILE, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(parts))
-
-    print(f'Wrote {OUT_FILE} with {len(items)} items')
+    content_model.save_cache(cache)
+
+    # newest first, without sorting everything; the URL tie-break makes the
+    # order independent of filesystem scan order
+    def newest(candidates):
+        return heapq.nlargest(MAX_ITEMS, candidates, key=feed_order)
+
+    main_items = newest(items)
+    feed_list = [{'dir': '', 'title': CHANNEL_TITLE, 'description': CHANNEL_DESC,
+                  'home': SITE_URL, 'items': main_items}]
+    for section, label in SECTION_FEEDS.items():
+        feed_list.append({
+            'dir': f'feeds/{section}',
+            'title': f'{CHANNEL_TITLE} — {label}',
+            'description': f'{label} from {CHANNEL_TITLE}',
+            'home': f'{SITE_URL}/{section}/',
+            'items': newest(it for it in items if it['section'] == section),
+        })
+
+    # Only items that ship in some feed are converted, each exactly once,
+    # in the shared newest-first order the writers stream them in
+    chosen = {id(it) for feed in feed_list for it in feed['items']}
+    # Same key as newest(), so every feed's items appear in this order
+    selected = sorted((it for it in items if id(it) in chosen), key=feed_order, reverse=True)
+
+    def convert(it):
+        return converted_html(it['doc'], it['url'], html_cache, stats)
+
+    with tracing.span("write feeds", cat="rss", items=len(selected)):
+        results = feeds.write_feeds(ROOT, SITE_URL, AUTHOR, feed_list, selected, convert)
+    tracing.counter("rss html cache", hits=stats['hits'], misses=stats['misses'])
+    written = [r['path'] for r in results if r['changed']]
+    write_etags(results)
+    if stats['misses'] or len(stats['used']) != len(html_cache['entries']):
+        save_html_cache(html_cache, stats['used'])
+
+    # Post-render runs after Quarto has copied resources, so the fresh feeds
+    # would otherwise only ship with the next render
+    out_dir = os.environ.get('QUARTO_PROJECT_OUTPUT_DIR')
+    if out_dir:
+        out_dir = os.path.join(ROOT, out_dir)
+        for r in results:
+            dst = os.path.join(out_dir, os.path.relpath(r['path'], ROOT))
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            # copy2 keeps the mtime, so Last-Modified only moves on real changes
+            shutil.copy2(r['path'], dst)
+
+    print(f"Wrote {len(written)} of {len(results)} feed files ({', '.join(sorted(feeds.FORMATS))}; "
+          f"{len(results) - len(written)} unchanged) with {len(main_items)} items "
+          f"(HTML cache: {stats['hits']} hits, {stats['misses']} misses)")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,130 @@
+"""git_dates.py
+
+First- and last-commit dates for the site's content files.
+
+One `git log --name-only` over the `.qmd` files resolves every file's
+creation (first commit) and modification (last commit) date at once; the
+result is kept in `.cache/git-dates.json` keyed by HEAD. When HEAD moves
+forward only the new commits are read. Lookups are dict accesses, so
+generators can ask for any number of files without spawning git per file.
+
+Files git does not know about (new, untracked, or outside a repository)
+fall back to their filesystem mtime. CI checkouts must fetch full history
+(e.g. `fetch-depth: 0`); in a shallow clone every file's first commit is
+the graft point.
+
+Used by generate_rss.py; calculate-reading-time.py and generate-projects.py
+can query it the same way:
+
+    import git_dates
+
+    dates = git_dates.load()
+    git_dates.created(path, dates), git_dates.modified(path, dates)
+"""
+
+import json
+import os
+import subprocess
+from datetime import datetime, UTC
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_FILE = ROOT / ".cache" / "git-dates.json"
+PATHSPEC = "*.qmd"
+# Commit header lines start with NUL (%x00), which can't appear in a path
+COMMIT_MARK = "\x00"
+
+
+def git(*args):
+    """stdout of `git <args>` in the repo root, or None if git fails."""
+    try:
+        # quotePath=off: non-ASCII paths come out verbatim, not octal-escaped
+        result = subprocess.run(
+            ["git", "-c", "core.quotePath=off", *args],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout
+
+
+def read_log(files, revisions):
+    """Fold `git log` over `revisions` into files {path: [first, last]}.
+
+    Log output is newest first, so a file's first line seen is its last
+    commit and the last line seen its first commit. Entries already in
+    `files` come from older history: their first date is kept.
+    """
+    out = git("log", "--format=%x00%cI", "--name-only",
+              "--no-renames", *revisions, "--", PATHSPEC)
+    if out is None:
+        return False
+    seen = {}
+    date = None
+    for line in out.splitlines():
+        if line.startswith(COMMIT_MARK):
+            date = line[1:]
+        elif line and date:
+            if line not in seen:
+                seen[line] = [date, date]
+            else:
+                seen[line][0] = date
+    for path, (first, last) in seen.items():
+        if path in files:
+            files[path][1] = last
+        else:
+            files[path] = [first, last]
+    return True
+
+
+def load():
+    """Date table for the current HEAD, from cache or a single git log."""
+    head = (git("rev-parse", "HEAD") or "").strip()
+    if not head:
+        return {"head": None, "files": {}}
+    try:
+        with CACHE_FILE.open("r", encoding="utf-8") as fh:
+            cache = json.load(fh)
+    except (OSError, ValueError):
+        cache = {}
+    if cache.get("head") == head:
+        return cache
+
+    old = cache.get("head")
+    files = cache.get("files", {})
+    if old and git("merge-base", "--is-ancestor", old, head) is not None:
+        # Fast-forward: only the new commits need reading
+        ok = read_log(files, [f"{old}..{head}"])
+    else:
+        files = {}
+        ok = read_log(files, [head])
+    if not ok:
+        return {"head": None, "files": {}}
+
+    cache = {"head": head, "files": files}
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE_FILE.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(cache, sort_keys=True), encoding="utf-8")
+    tmp.replace(CACHE_FILE)
+    return cache
+
+
+def _lookup(path, dates, which):
+    path = Path(path).resolve()
+    try:
+        entry = dates["files"].get(path.relative_to(ROOT).as_posix())
+    except ValueError:
+        entry = None
+    if entry:
+        return datetime.fromisoformat(entry[which])
+    return datetime.fromtimestamp(path.stat().st_mtime, UTC)
+
+
+def created(path, dates):
+    """Date of the first commit that added `path` (timezone-aware)."""
+    return _lookup(path, dates, 0)
+
+
+def modified(path, dates):
+    """Date of the last commit that touched `path` (timezone-aware)."""
+    return _lookup(path, dates, 1)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""sync_assets.py
+
+Mirror `_assets/images/photos/` into the rendered site incrementally.
+
+Runs as a Quarto post-render hook (the photo library is no longer a Quarto
+`resources` entry, so it is not copied on every render). A manifest in
+`.cache/asset-sync.json` records each source file's size, mtime and sha256
+and the stat of its copy in the site; a file whose source and copy both
+still match is not touched. Changed or missing files are placed with the
+cheapest method that works:
+
+  reflink   copy-on-write clone (btrfs, XFS, APFS-style filesystems): no
+            data written, and the copy can't alias the source
+  hardlink  same inode as the source: no data written
+  copy      plain byte copy (different filesystems)
+
+Files in the site tree that no longer exist in the source are deleted. The
+summary reports how many files were placed by each method and the bytes
+actually copied, so build I/O scales with what changed.
+
+Usage:
+  python _scripts/sync_assets.py                 # into $QUARTO_PROJECT_OUTPUT_DIR or _site
+  python _scripts/sync_assets.py --mode copy     # never link
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+import tracing
+
+try:
+    import fcntl
+except ImportError:  # Windows: no reflinks
+    fcntl = None
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC_REL = Path("_assets") / "images" / "photos"
+MANIFEST_FILE = ROOT / ".cache" / "asset-sync.json"
+# Linux FICLONE ioctl: share the source's extents with the destination
+FICLONE = 0x40049409
+METHODS = ("reflink", "hardlink", "copy")
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def source_files(src):
+    """Repo-relative paths of every file to publish (dotfiles are build state)."""
+    files = []
+    for dirpath, dirs, names in os.walk(src):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(names):
+            if not name.startswith("."):
+                files.append((Path(dirpath) / name).relative_to(src).as_posix())
+    return files
+
+
+def reflink(src, dst):
+    if fcntl is None:
+        raise OSError("reflinks are not supported on this platform")
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+    shutil.copystat(src, dst)
+
+
+def place(src, dst, methods):
+    """Put `src` at `dst` with the first method in `methods` that works.
+
+    Returns (method, bytes_copied).
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(dst.name + ".sync-tmp")
+    for method in methods:
+        try:
+            if tmp.exists():
+                tmp.unlink()
+            if method == "reflink":
+                reflink(src, tmp)
+                copied = 0
+            elif method == "hardlink":
+                os.link(src, tmp)
+                copied = 0
+            else:
+                shutil.copy2(src, tmp)
+                copied = src.stat().st_size
+        except OSError:
+            continue
+        os.replace(tmp, dst)
+        return method, copied
+    raise OSError(f"could not place {dst}")
+
+
+def stat_key(path):
+    st = path.stat()
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def load_manifest():
+    try:
+        with MANIFEST_FILE.open("r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest):
+    MANIFEST_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = MANIFEST_FILE.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(manifest, sort_keys=True), encoding="utf-8")
+    tmp.replace(MANIFEST_FILE)
+
+
+def sync(src, dst, methods):
+    """Mirror `src` into `dst`; returns a stats dict."""
+    manifest = load_manifest()
+    # The manifest describes one destination; another one starts fresh
+    entries = manifest.get("files", {}) if manifest.get("dst") == str(dst) else {}
+    stats = {"unchanged": 0, "removed": 0, "bytes_copied": 0, **{m: 0 for m in METHODS}}
+    files = source_files(src)
+    new_entries = {}
+
+    for rel in files:
+        s, d = src / rel, dst / rel
+        st = s.stat()
+        entry = entries.get(rel)
+        if entry and (entry["size"], entry["mtime_ns"]) != (st.st_size, st.st_mtime_ns):
+            # Touched: only a content change counts
+            digest = sha256_file(s)
+            entry = dict(entry, size=st.st_size, mtime_ns=st.st_mtime_ns) if digest == entry["sha256"] else None
+        try:
+            dst_key = stat_key(d)
+        except FileNotFoundError:
+            dst_key = None
+        if dst_key is not None and dst_key[2] == st.st_ino and os.path.samefile(s, d):
+            # Hardlinked earlier: the copy is the source, whatever its stat
+            in_sync = True
+        else:
+            in_sync = entry is not None and dst_key == entry["dst"]
+        if in_sync:
+            if entry is None:
+                entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256_file(s)}
+            entry["dst"] = dst_key
+            stats["unchanged"] += 1
+            new_entries[rel] = entry
+            continue
+        method, copied = place(s, d, methods)
+        stats[method] += 1
+        stats["bytes_copied"] += copied
+        new_entries[rel] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": entry["sha256"] if entry else sha256_file(s),
+            "dst": stat_key(d),
+        }
+
+    keep = set(files)
+    if dst.is_dir():
+        for dirpath, dirs, names in os.walk(dst, topdown=False):
+            for name in names:
+                path = Path(dirpath) / name
+                if path.relative_to(dst).as_posix() not in keep:
+                    path.unlink()
+                    stats["removed"] += 1
+            if dirpath != str(dst) and not os.listdir(dirpath):
+                os.rmdir(dirpath)
+
+    save_manifest({"dst": str(dst), "files": new_entries})
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync photo assets into the rendered site")
+    parser.add_argument("--mode", choices=["auto", *METHODS], default="auto",
+                        help="How to place changed files; auto tries reflink, hardlink, copy (default: auto)")
+    parser.add_argument("--out-dir", help="Site directory (default: $QUARTO_PROJECT_OUTPUT_DIR or _site)")
+    parser.add_argument("--trace", metavar="OUT.json",
+                        help="Write a Chrome trace of this run (same as SITE_TRACE=OUT.json)")
+    args = parser.parse_args()
+    tracing.configure(args.trace)
+
+    out_dir = ROOT / (args.out_dir or os.environ.get("QUARTO_PROJECT_OUTPUT_DIR") or "_site")
+    src = ROOT / SRC_REL
+    if not src.is_dir():
+        print(f"Source directory {SRC_REL} not found; nothing to sync.")
+        return
+    methods = list(METHODS) if args.mode == "auto" else [args.mode]
+    with tracing.span("sync assets", cat="assets"):
+        stats = sync(src, out_dir / SRC_REL, methods)
+    tracing.counter("asset sync", bytes_copied=stats["bytes_copied"], unchanged=stats["unchanged"],
+                    removed=stats["removed"])
+    placed = stats["reflink"] + stats["hardlink"] + stats["copy"]
+    print(f"Synced {SRC_REL.as_posix()}: {placed} placed ({stats['reflink']} reflinked, "
+          f"{stats['hardlink']} hardlinked, {stats['copy']} copied), {stats['unchanged']} unchanged, "
+          f"{stats['removed']} removed; {stats['bytes_copied'] / 1024:.1f} KiB written")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""tracing.py
+
+Lightweight build tracing for the `_scripts` generators.
+
+Spans and counters are recorded as Chrome trace events, viewable in
+chrome://tracing or https://ui.perfetto.dev. Tracing is off unless
+`SITE_TRACE=<out.json>` is set or a script is run with `--trace <out.json>`;
+when off, span() returns a shared no-op context manager.
+
+Every process (including process-pool workers and generators started by
+build.py, which inherit SITE_TRACE) appends its events, one JSON object per
+line, to `<out.json>.parts/<pid>.jsonl`. The process that turned tracing on
+(the root) clears old parts when it starts and merges all of them into
+`<out.json>` when it exits, so a parallel build reads as one timeline.
+Timestamps are wall-clock microseconds so separate processes line up.
+
+    import tracing
+
+    tracing.configure(args.trace)          # or rely on SITE_TRACE
+    with tracing.span("resize", cat="thumbnails", width=800):
+        ...
+    tracing.counter("thumbnails", created=12, skipped=3)
+"""
+
+import atexit
+import contextlib
+import glob
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+ENV_VAR = "SITE_TRACE"
+# Set for children, so only the process that enabled tracing merges
+ROOT_ENV_VAR = "SITE_TRACE_ROOT"
+
+_NULL = contextlib.nullcontext()
+_state = {"out": None, "fh": None, "pid": None}
+_lock = threading.Lock()
+
+
+def enabled():
+    return _state["out"] is not None
+
+
+def parts_dir(out):
+    return out + ".parts"
+
+
+def configure(path=None):
+    """Turn tracing on for `path` (default: $SITE_TRACE); no-op without one."""
+    path = path or os.environ.get(ENV_VAR)
+    if not path or _state["out"] == os.path.abspath(path):
+        return
+    out = os.path.abspath(path)
+    _state["out"] = out
+    if os.environ.get(ROOT_ENV_VAR, str(os.getpid())) == str(os.getpid()):
+        # Root process: start a fresh trace and merge it on exit (a --trace
+        # flag overrides a path taken from SITE_TRACE at import)
+        shutil.rmtree(parts_dir(out), ignore_errors=True)
+        os.environ[ROOT_ENV_VAR] = str(os.getpid())
+        atexit.unregister(merge)
+        atexit.register(merge, out)
+    os.environ[ENV_VAR] = out
+
+
+def _write(event):
+    with _lock:
+        if _state["pid"] != os.getpid():
+            # First event in this process (or a forked worker): own part file.
+            # Line buffering keeps events that were written even if the
+            # process exits without running atexit (pool workers do).
+            os.makedirs(parts_dir(_state["out"]), exist_ok=True)
+            path = os.path.join(parts_dir(_state["out"]), f"{os.getpid()}.jsonl")
+            _state["fh"] = open(path, "a", encoding="utf-8", buffering=1)
+            _state["pid"] = os.getpid()
+            name = os.path.basename(sys.argv[0]) or "python"
+            _state["fh"].write(json.dumps({"name": "process_name", "ph": "M", "pid": _state["pid"],
+                                           "tid": 0, "args": {"name": f"{name} ({_state['pid']})"}}) + "\n")
+        event["pid"] = _state["pid"]
+        _state["fh"].write(json.dumps(event) + "\n")
+
+
+def _now_us():
+    return time.time_ns() // 1000
+
+
+@contextlib.contextmanager
+def _span(name, cat, args):
+    start = _now_us()
+    try:
+        yield
+    finally:
+        _write({"name": name, "cat": cat, "ph": "X", "ts": start, "dur": _now_us() - start,
+                "tid": threading.get_ident() % 1_000_000, "args": args})
+
+
+def span(name, cat="build", **args):
+    """Context manager timing the enclosed block as one trace span."""
+    if not enabled():
+        return _NULL
+    return _span(name, cat, args)
+
+
+def counter(name, **values):
+    """Record counter values (a "C" event) at the current time."""
+    if enabled():
+        _write({"name": name, "ph": "C", "ts": _now_us(), "tid": 0, "args": values})
+
+
+def merge(out):
+    """Combine every part under `<out>.parts/` into the trace file `out`."""
+    events = []
+    for path in sorted(glob.glob(os.path.join(parts_dir(out), "*.jsonl"))):
+        with open(path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if line:
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        # A worker killed mid-write leaves a partial last line
+                        continue
+    tmp = f"{out}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fh)
+    os.replace(tmp, out)
+
+
+configure()